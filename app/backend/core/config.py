@@ -5,7 +5,27 @@ from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-from pydantic import BaseSettings, Field, validator
+from pydantic import BaseModel, BaseSettings, Field, validator
+
+
+class GateRule(BaseModel):
+    """Extra gatekeeper rule: block when `column op threshold`."""
+
+    name: str = Field(..., min_length=1)
+    column: str = Field(..., min_length=1)
+    op: str = Field(..., regex="^(>|>=|<|<=|==|!=)$")
+    threshold: float | str
+    reason: str | None = None
+    default: float | None = None
+    scope: str = Field(default="all", regex="^(all|backtest|point|bounds)$")
+
+    @validator("threshold")
+    def threshold_is_numeric_setting(cls, value: float | str) -> float | str:  # noqa: D417
+        if isinstance(value, str):
+            field = Settings.__fields__.get(value)
+            if field is None or field.type_ not in (int, float):
+                raise ValueError(f"threshold {value!r} is not a numeric settings field")
+        return value
 
 
 class Settings(BaseSettings):
@@ -13,10 +33,27 @@ class Settings(BaseSettings):
 
     admin_password: str = Field(..., alias="ADMIN_PASSWORD")
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
+    openai_base_url: str | None = Field(default=None, alias="OPENAI_BASE_URL")
+    openai_model: str = Field("gpt-4o-mini", alias="OPENAI_MODEL")
+    llm_shard_tokens: int = Field(0, alias="LLM_SHARD_TOKENS")
+    llm_concurrency: int = Field(4, alias="LLM_CONCURRENCY")
+    llm_shard_retries: int = Field(1, alias="LLM_SHARD_RETRIES")
+    llm_max_retries: int = Field(3, alias="LLM_MAX_RETRIES")
+    llm_call_timeout: float = Field(120.0, alias="LLM_CALL_TIMEOUT")
+    llm_backoff_base: float = Field(1.0, alias="LLM_BACKOFF_BASE")
+    llm_backoff_max: float = Field(30.0, alias="LLM_BACKOFF_MAX")
+    llm_cache_ttl: int = Field(86400, alias="LLM_CACHE_TTL")
+    llm_cache_max_bytes: int = Field(50_000_000, alias="LLM_CACHE_MAX_BYTES")
     news_provider: str = Field("perplexity", alias="NEWS_PROVIDER")
     news_api_key: str | None = Field(default=None, alias="NEWS_API_KEY")
+    news_concurrency: int = Field(10, alias="NEWS_CONCURRENCY")
+    news_rate_limit: float = Field(5.0, alias="NEWS_RATE_LIMIT")
+    news_cache_ttl: int = Field(3600, alias="NEWS_CACHE_TTL")
     telegram_bot_token: str | None = Field(default=None, alias="TELEGRAM_BOT_TOKEN")
     telegram_chat_id: str | None = Field(default=None, alias="TELEGRAM_CHAT_ID")
+    telegram_rate_interval: float = Field(1.0, alias="TELEGRAM_RATE_INTERVAL")
+    telegram_max_retries: int = Field(3, alias="TELEGRAM_MAX_RETRIES")
+    telegram_drain_timeout: float = Field(30.0, alias="TELEGRAM_DRAIN_TIMEOUT")
     timezone: str = Field("Europe/Brussels", alias="TZ")
     cron_hour: int = Field(7, alias="CRON_HOUR")
 
@@ -27,11 +64,39 @@ class Settings(BaseSettings):
     max_dd: float = Field(0.08, alias="MAX_DD")
     min_hit_rate: float = Field(0.48, alias="MIN_HIT_RATE")
     min_sample: int = Field(30, alias="MIN_SAMPLE")
+    robustness_enabled: bool = Field(False, alias="ROBUSTNESS_ENABLED")
+    bootstrap_samples: int = Field(2000, ge=1, alias="BOOTSTRAP_SAMPLES")
+    bootstrap_block: int = Field(5, ge=1, alias="BOOTSTRAP_BLOCK")
+    bootstrap_confidence: float = Field(0.9, gt=0, lt=1, alias="BOOTSTRAP_CONFIDENCE")
+    walk_forward_folds: int = Field(4, ge=1, alias="WALK_FORWARD_FOLDS")
+    gate_on_lower_bound: bool = Field(False, alias="GATE_ON_LOWER_BOUND")
+    # Extra gatekeeper rules, a JSON list of
+    # {name, column, op, threshold, reason?, default?, scope?}.
+    gate_rules: list[dict[str, Any]] = Field(default_factory=list, alias="GATE_RULES")
+
+    bar_store_dir: str = Field(default=str(Path("data") / "bars"), alias="BAR_STORE_DIR")
+    bar_store_max_age: int = Field(900, alias="BAR_STORE_MAX_AGE")
+    ohlcv_batch_size: int = Field(50, alias="OHLCV_BATCH_SIZE")
+    pipeline_workers: int = Field(0, alias="PIPELINE_WORKERS")
+    incremental_indicators: bool = Field(False, alias="INCREMENTAL_INDICATORS")
+    chart_cache_max_bytes: int = Field(200_000_000, alias="CHART_CACHE_MAX_BYTES")
+    chart_prerender: bool = Field(False, alias="CHART_PRERENDER")
+    result_batch_size: int = Field(500, alias="RESULT_BATCH_SIZE")
+    backtest_cache_ttl: int = Field(7 * 86400, alias="BACKTEST_CACHE_TTL")
+    backtest_cache_max_entries: int = Field(100_000, alias="BACKTEST_CACHE_MAX_ENTRIES")
+    settings_cache_ttl: float = Field(60.0, alias="SETTINGS_CACHE_TTL")
+    queue_poll_interval: float = Field(2.0, alias="QUEUE_POLL_INTERVAL")
+    queue_heartbeat_interval: float = Field(10.0, alias="QUEUE_HEARTBEAT_INTERVAL")
+    queue_stale_after: float = Field(60.0, alias="QUEUE_STALE_AFTER")
+    queue_max_attempts: int = Field(3, alias="QUEUE_MAX_ATTEMPTS")
 
     database_url: str = Field(
         default=f"sqlite:///{Path('data').absolute() / 'app.db'}",
         alias="DATABASE_URL",
     )
+    sqlite_mmap_size: int = Field(268_435_456, alias="SQLITE_MMAP_SIZE")
+    sqlite_cache_size_kb: int = Field(65_536, alias="SQLITE_CACHE_SIZE_KB")
+    sqlite_busy_timeout_ms: int = Field(5000, alias="SQLITE_BUSY_TIMEOUT_MS")
 
     class Config:
         env_file = ".env"
@@ -46,6 +111,10 @@ class Settings(BaseSettings):
             raise ValueError("NEWS_PROVIDER must be either 'perplexity' or 'tavily'")
         return provider
 
+    @validator("gate_rules", each_item=True)
+    def validate_gate_rule(cls, value: dict[str, Any]) -> dict[str, Any]:  # noqa: D417
+        return GateRule.parse_obj(value).dict()
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
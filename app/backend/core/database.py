@@ -1,20 +1,132 @@
 """Database utilities."""
 from __future__ import annotations
 
-from contextlib import contextmanager
-from typing import Generator
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
 
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .config import get_settings
+from .serialization import dumps_json
 
-_engine = create_engine(get_settings().database_url, echo=False, connect_args={"check_same_thread": False})
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _engine_options(url: str, is_async: bool = False) -> dict[str, Any]:
+    """Engine keyword arguments shared by the sync and async engines.
+
+    SQLAlchemy defaults to NullPool for file-backed SQLite, which reconnects (and re-runs
+    the pragmas) for every session; a small queue pool keeps tuned connections warm.
+    """
+
+    options: dict[str, Any] = {"echo": False, "json_serializer": dumps_json}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if parsed.database and parsed.database != ":memory:":
+            options["poolclass"] = AsyncAdaptedQueuePool if is_async else QueuePool
+    return options
+
+
+def apply_sqlite_pragmas(engine: Engine) -> None:
+    """Tune every new SQLite connection of `engine`.
+
+    WAL lets API reads proceed while the pipeline writes, and `synchronous=NORMAL` is
+    durable under WAL except for the last transactions on power loss. Memory-mapped I/O
+    and a larger page cache cut read syscalls for the job and cache tables.
+    """
+
+    if engine.dialect.name != "sqlite":
+        return
+    settings = get_settings()
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection: Any, _: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        # Negative values are KiB rather than pages.
+        cursor.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_size_kb)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.close()
+
+
+_engine = create_engine(get_settings().database_url, **_engine_options(get_settings().database_url))
+apply_sqlite_pragmas(_engine)
+_async_engine: AsyncEngine | None = None
 
 
 def init_db() -> None:
     """Create database tables if they do not exist."""
 
     SQLModel.metadata.create_all(_engine)
+    _add_missing_columns()
+    _create_missing_indexes()
+
+
+def _add_missing_columns() -> None:
+    """Add nullable columns introduced after a table was first created.
+
+    There is no migration tool; `create_all` only creates missing tables, so columns
+    added to existing models are appended here.
+    """
+
+    inspector = inspect(_engine)
+    with _engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing or not column.nullable:
+                    continue
+                column_type = column.type.compile(dialect=_engine.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'
+                )
+
+
+def _create_missing_indexes() -> None:
+    """Create indexes declared on models whose tables predate them."""
+
+    with _engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+
+def async_database_url(url: str) -> str:
+    """Return `url` with the async driver for its backend (aiosqlite, asyncpg)."""
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() in _ASYNC_DRIVERS and "+" not in parsed.drivername:
+        parsed = parsed.set(drivername=_ASYNC_DRIVERS[parsed.get_backend_name()])
+    return parsed.render_as_string(hide_password=False)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Return the shared async engine, creating it on first use."""
+
+    global _async_engine
+    if _async_engine is None:
+        url = get_settings().database_url
+        _async_engine = create_async_engine(
+            async_database_url(url), **_engine_options(url, is_async=True)
+        )
+        apply_sqlite_pragmas(_async_engine.sync_engine)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    global _async_engine
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
 
 
 @contextmanager
@@ -25,8 +137,23 @@ def session_scope() -> Generator[Session, None, None]:
         yield session
 
 
+@asynccontextmanager
+async def async_session_scope() -> AsyncGenerator[AsyncSession, None]:
+    """Async counterpart of `session_scope`; objects stay readable after commit."""
+
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
 def get_session() -> Generator[Session, None, None]:
     """Dependency for FastAPI endpoints."""
 
     with Session(_engine) as session:
         yield session
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for `async def` endpoints."""
+
+    async with async_session_scope() as session:
+        yield session
@@ -0,0 +1,20 @@
+"""JSON encoding helpers, using orjson when it is installed."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def dumps_json(value: Any) -> str:
+    """Serialise to compact JSON; numpy scalars/arrays and non-str keys are accepted."""
+
+    if orjson is not None:
+        return orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY, default=str
+        ).decode()
+    return json.dumps(value, separators=(",", ":"), default=str)
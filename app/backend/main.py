@@ -6,9 +6,14 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .core.database import init_db
-from .routes import charts, jobs, run, settings, watchlist
+from .core.database import dispose_async_engine, init_db
+from .routes import charts, jobs, queue, run, settings, watchlist
+from .services.prompts import prompt_templates
+from .services.report import close_outbox
+from .services.research import close_http_client
 from .services.scheduler import pipeline_scheduler
+from .services.strategy import close_openai_client
+from .services.workers import shutdown_process_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +28,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["ETag", "X-Next-Cursor"],
     )
 
     app.include_router(run.router)
@@ -30,14 +36,26 @@ def create_app() -> FastAPI:
     app.include_router(settings.router)
     app.include_router(watchlist.router)
     app.include_router(charts.router)
+    app.include_router(queue.router)
 
     @app.on_event("startup")
     async def startup_event() -> None:  # noqa: D401
-        """Start scheduler on startup."""
+        """Parse prompt templates and start scheduler on startup."""
 
+        prompt_templates.preload()
         pipeline_scheduler.start()
         logger.info("Scheduler initialised")
 
+    @app.on_event("shutdown")
+    async def shutdown_event() -> None:  # noqa: D401
+        """Release worker processes and pooled connections on shutdown."""
+
+        shutdown_process_pool()
+        await close_outbox()
+        await close_http_client()
+        await close_openai_client()
+        await dispose_async_engine()
+
     return app
 
 
@@ -0,0 +1,15 @@
+"""Cached backtest metrics."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class BacktestCache(SQLModel, table=True):
+    """Backtest metrics keyed by a fingerprint of the bars and the strategy spec."""
+
+    key: str = Field(primary_key=True)
+    symbol: str
+    metrics: str
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, index=True)
@@ -1,22 +1,26 @@
 """Job model definition."""
-from __future__ import annotations
 
 from datetime import datetime
-from typing import TYPE_CHECKING
 
+from sqlalchemy import JSON, Column, Index
 from sqlmodel import Field, Relationship, SQLModel
 
-if TYPE_CHECKING:  # pragma: no cover
-    from .job_result import JobResult
-
 
 class Job(SQLModel, table=True):
     """Represents an execution of the pipeline."""
 
+    # Backs the newest-first keyset pagination of GET /api/jobs.
+    __table_args__ = (Index("ix_job_started_at_id", "started_at", "id"),)
+
     id: int | None = Field(default=None, primary_key=True)
     started_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
     finished_at: datetime | None = None
     status: str = Field(default="RUNNING")
     summary: str | None = None
+    stats: dict | None = Field(default=None, sa_column=Column(JSON, nullable=True))
 
     results: list["JobResult"] = Relationship(back_populates="job")
+
+
+# Register JobResult with the mapper so `Job.results` resolves wherever Job is imported.
+from .job_result import JobResult  # noqa: E402,F401
@@ -1,8 +1,8 @@
 """Job result model definition."""
-from __future__ import annotations
 
 from datetime import datetime
 
+from sqlalchemy import JSON, Column
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -10,13 +10,13 @@ class JobResult(SQLModel, table=True):
     """Per-ticker results for a job."""
 
     id: int | None = Field(default=None, primary_key=True)
-    job_id: int = Field(foreign_key="job.id")
+    job_id: int = Field(foreign_key="job.id", index=True)
     ticker: str
     decision: str
-    metrics: dict | None = Field(default=None, sa_column_kwargs={"nullable": True})
+    metrics: dict | None = Field(default=None, sa_column=Column(JSON, nullable=True))
     chart_path: str | None = None
-    sources: list[str] | None = Field(default=None, sa_column_kwargs={"nullable": True})
-    raw_llm: dict | None = Field(default=None, sa_column_kwargs={"nullable": True})
+    sources: list[str] | None = Field(default=None, sa_column=Column(JSON, nullable=True))
+    raw_llm: dict | None = Field(default=None, sa_column=Column(JSON, nullable=True))
     created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
 
     job: "Job" = Relationship(back_populates="results")
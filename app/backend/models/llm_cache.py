@@ -0,0 +1,17 @@
+"""Cached LLM strategy decisions."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class LlmCache(SQLModel, table=True):
+    """Per-ticker LLM decision keyed by a hash of its inputs, prompts and model."""
+
+    key: str = Field(primary_key=True)
+    ticker: str
+    model: str
+    decision: str
+    size: int = Field(default=0)
+    created_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, index=True)
@@ -0,0 +1,29 @@
+"""Durable pipeline run queue."""
+
+from datetime import datetime
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+
+class QueuedRun(SQLModel, table=True):
+    """A pipeline run waiting for, or held by, a worker process.
+
+    Status moves QUEUED -> CLAIMED -> DONE/FAILED; a CLAIMED row whose heartbeat goes
+    stale is put back to QUEUED so another worker can pick it up.
+    """
+
+    # Backs the oldest-first claim scan and the per-status depth counts.
+    __table_args__ = (Index("ix_queuedrun_status_enqueued_at", "status", "enqueued_at"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: int = Field(foreign_key="job.id", index=True)
+    ticker: str | None = None
+    status: str = Field(default="QUEUED")
+    attempts: int = Field(default=0)
+    worker_id: str | None = None
+    enqueued_at: datetime = Field(default_factory=datetime.utcnow, nullable=False)
+    claimed_at: datetime | None = None
+    heartbeat_at: datetime | None = None
+    finished_at: datetime | None = None
+    error: str | None = None
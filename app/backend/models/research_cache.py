@@ -0,0 +1,16 @@
+"""Cached news research responses."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class ResearchCache(SQLModel, table=True):
+    """Parsed provider response keyed by provider, ticker and query."""
+
+    key: str = Field(primary_key=True)
+    provider: str
+    ticker: str
+    payload: str
+    fetched_at: datetime = Field(default_factory=datetime.utcnow, nullable=False, index=True)
@@ -1,8 +1,10 @@
 """Setting model definition."""
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import JSON, Column
 from sqlmodel import Field, SQLModel
 
 
@@ -24,3 +26,7 @@ class Setting(SQLModel, table=True):
     max_dd: float = Field(default=0.08)
     min_hit_rate: float = Field(default=0.48)
     min_sample: int = Field(default=30)
+    gate_rules: list | None = Field(default=None, sa_column=Column(JSON, nullable=True))
+    # Set when saved through the settings API; NULL on rows older versions created
+    # with the defaults above just by reading the settings or starting a run.
+    saved_at: datetime | None = None
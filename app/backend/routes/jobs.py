@@ -1,56 +1,199 @@
 """Job listing endpoints."""
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import hashlib
+from collections.abc import Iterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 
-from ..core.database import get_session
+from ..core.database import get_session, session_scope
 from ..core.security import optional_admin_header
+from ..core.serialization import dumps_json
 from ..models.job import Job
-from ..schemas.job import JobRead, JobWithResults
+from ..models.job_result import JobResult
+from ..schemas.job import JobRead, JobResultRead, JobWithResults
 
 router = APIRouter(prefix="/api", tags=["jobs"])
 
 
-@router.get("/jobs", dependencies=[Depends(optional_admin_header)])
-def list_jobs(session: Session = Depends(get_session)) -> list[JobRead]:
-    jobs = session.exec(select(Job).order_by(Job.started_at.desc())).all()
-    return [
+def encode_cursor(job: Job) -> str:
+    """Opaque cursor pointing just past `job` in newest-first order."""
+
+    raw = f"{job.started_at.isoformat()}|{job.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        started_at, job_id = raw.split("|")
+        return datetime.fromisoformat(started_at), int(job_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def fetch_job_page(
+    session: Session,
+    limit: int,
+    cursor: str | None = None,
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> tuple[list[Job], str | None]:
+    """Return up to `limit` jobs newest first and the cursor of the next page, if any.
+
+    Seeks on (started_at, id) through `ix_job_started_at_id` instead of using OFFSET,
+    so the cost of a page does not grow with the number of jobs.
+    """
+
+    query = select(Job).order_by(Job.started_at.desc(), Job.id.desc()).limit(limit + 1)
+    if cursor:
+        query = query.where(tuple_(Job.started_at, Job.id) < decode_cursor(cursor))
+    if status:
+        query = query.where(Job.status == status)
+    if since:
+        query = query.where(Job.started_at >= since)
+    if until:
+        query = query.where(Job.started_at < until)
+    jobs = session.exec(query).all()
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        return jobs, encode_cursor(jobs[-1])
+    return jobs, None
+
+
+@router.get("/jobs", response_model=list[JobRead], dependencies=[Depends(optional_admin_header)])
+def list_jobs(
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    status: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    if_none_match: str | None = Header(None, alias="if-none-match"),
+    session: Session = Depends(get_session),
+) -> Response:
+    """List jobs newest first; the next page's cursor is returned in `X-Next-Cursor`."""
+
+    jobs, next_cursor = fetch_job_page(session, limit, cursor, status, since, until)
+    payload = [
         JobRead(
             id=job.id,
             started_at=job.started_at,
             finished_at=job.finished_at,
             status=job.status,
             summary=job.summary,
+            stats=job.stats,
         )
         for job in jobs
     ]
+    body = dumps_json(jsonable_encoder(payload))
+    etag = f'W/"{hashlib.sha1(body.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if if_none_match and etag in {tag.strip() for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+RESULT_FIELDS = (
+    "id", "ticker", "decision", "metrics", "chart_path", "sources", "raw_llm", "created_at"
+)
+DEFAULT_RESULT_FIELDS = tuple(name for name in RESULT_FIELDS if name != "raw_llm")
+_STREAM_BATCH = 500
+
+
+def parse_result_fields(fields: str | None) -> list[str]:
+    """Resolve a comma-separated projection; `id` and `ticker` are always included."""
+
+    if not fields:
+        return list(DEFAULT_RESULT_FIELDS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(RESULT_FIELDS)
+    if unknown:
+        detail = f"Unknown result fields: {', '.join(sorted(unknown))}"
+        raise HTTPException(status_code=400, detail=detail)
+    requested |= {"id", "ticker"}
+    return [name for name in RESULT_FIELDS if name in requested]
 
 
-@router.get("/jobs/{job_id}", dependencies=[Depends(optional_admin_header)])
-def get_job(job_id: int, session: Session = Depends(get_session)) -> JobWithResults:
-    job = session.get(Job, job_id)
+@router.get(
+    "/jobs/{job_id}",
+    response_model=JobWithResults,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(optional_admin_header)],
+)
+def get_job(
+    job_id: int,
+    fields: str | None = Query(
+        None, description="Comma-separated result fields; raw_llm is omitted by default"
+    ),
+    response_format: str = Query("json", alias="format", regex="^(json|ndjson)$"),
+    accept: str | None = Header(None),
+    session: Session = Depends(get_session),
+) -> JobWithResults | StreamingResponse:
+    """Return a job with its results, projected to `fields`.
+
+    With `format=ndjson` (or `Accept: application/x-ndjson`) the job is written as the
+    first line and each result as its own line, read from the database in batches.
+    """
+
+    columns = parse_result_fields(fields)
+    if response_format == "ndjson" or (accept and "application/x-ndjson" in accept):
+        job = session.get(Job, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        header = JobRead(
+            id=job.id,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            status=job.status,
+            summary=job.summary,
+            stats=job.stats,
+        )
+        return StreamingResponse(
+            _stream_results(header, columns), media_type="application/x-ndjson"
+        )
+
+    query = (
+        select(Job)
+        .where(Job.id == job_id)
+        .options(
+            selectinload(Job.results).load_only(*(getattr(JobResult, name) for name in columns))
+        )
+    )
+    job = session.exec(query).first()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    from ..schemas.job import JobResultRead
-
     return JobWithResults(
         id=job.id,
         started_at=job.started_at,
         finished_at=job.finished_at,
         status=job.status,
         summary=job.summary,
+        stats=job.stats,
         results=[
-            JobResultRead(
-                id=result.id,
-                ticker=result.ticker,
-                decision=result.decision,
-                metrics=result.metrics,
-                chart_path=result.chart_path,
-                sources=result.sources,
-                raw_llm=result.raw_llm,
-                created_at=result.created_at,
-            )
+            JobResultRead(**{name: getattr(result, name) for name in columns})
             for result in job.results
         ],
     )
+
+
+def _stream_results(header: JobRead, columns: list[str]) -> Iterator[str]:
+    yield dumps_json(jsonable_encoder(header)) + "\n"
+    query = (
+        select(*(getattr(JobResult, name) for name in columns))
+        .where(JobResult.job_id == header.id)
+        .order_by(JobResult.id)
+        .execution_options(yield_per=_STREAM_BATCH)
+    )
+    with session_scope() as session:
+        for row in session.execute(query):
+            yield dumps_json(jsonable_encoder(dict(row._mapping))) + "\n"
@@ -0,0 +1,18 @@
+"""Run queue observability endpoint."""
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.database import get_async_session
+from ..core.security import optional_admin_header
+from ..services.job_queue import queue_stats
+
+router = APIRouter(prefix="/api", tags=["queue"])
+
+
+@router.get("/queue", dependencies=[Depends(optional_admin_header)])
+async def get_queue(session: AsyncSession = Depends(get_async_session)) -> dict[str, Any]:
+    return await queue_stats(session)
@@ -1,6 +1,8 @@
 """Settings endpoints."""
 from __future__ import annotations
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends
 from sqlmodel import Session
 
@@ -8,6 +10,11 @@ from ..core.database import get_session
 from ..core.security import admin_required_dependency
 from ..models.setting import Setting
 from ..schemas.setting import SettingRead, SettingUpdate
+from ..services.settings_provider import (
+    get_settings_snapshot,
+    invalidate_settings_snapshot,
+    snapshot_as_setting,
+)
 
 router = APIRouter(prefix="/api", tags=["settings"])
 
@@ -16,10 +23,9 @@ router = APIRouter(prefix="/api", tags=["settings"])
 def get_settings(session: Session = Depends(get_session)) -> Setting:
     setting = session.get(Setting, 1)
     if not setting:
-        setting = Setting()
-        session.add(setting)
-        session.commit()
-        session.refresh(setting)
+        # Nothing saved yet: show the env-derived values without persisting them, so
+        # env changes keep applying until settings are explicitly saved.
+        return snapshot_as_setting(get_settings_snapshot())
     return setting
 
 
@@ -33,6 +39,8 @@ def update_settings(payload: SettingUpdate, session: Session = Depends(get_sessi
         for key, value in payload.dict().items():
             setattr(setting, key, value)
         session.add(setting)
+    setting.saved_at = datetime.utcnow()
     session.commit()
     session.refresh(setting)
+    invalidate_settings_snapshot()
     return setting
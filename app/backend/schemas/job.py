@@ -12,14 +12,16 @@ class JobCreateResponse(BaseModel):
 
 
 class JobResultRead(BaseModel):
+    """A job result; fields outside the requested projection are left unset."""
+
     id: int
     ticker: str
-    decision: str
-    metrics: dict | None
-    chart_path: str | None
-    sources: list[str] | None
-    raw_llm: dict | None
-    created_at: datetime
+    decision: str | None = None
+    metrics: dict | None = None
+    chart_path: str | None = None
+    sources: list[str] | None = None
+    raw_llm: dict | None = None
+    created_at: datetime | None = None
 
 
 class JobRead(BaseModel):
@@ -28,6 +30,7 @@ class JobRead(BaseModel):
     finished_at: datetime | None
     status: str
     summary: str | None
+    stats: dict | None = None
 
 
 class JobWithResults(JobRead):
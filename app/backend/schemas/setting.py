@@ -1,8 +1,12 @@
 """Pydantic schemas for settings."""
 from __future__ import annotations
 
+from typing import Any
+
 from pydantic import BaseModel, Field, validator
 
+from ..core.config import GateRule
+
 
 class SettingRead(BaseModel):
     provider: str
@@ -19,6 +23,7 @@ class SettingRead(BaseModel):
     max_dd: float
     min_hit_rate: float
     min_sample: int
+    gate_rules: list[dict[str, Any]] | None = None
 
 
 class SettingUpdate(BaseModel):
@@ -36,6 +41,7 @@ class SettingUpdate(BaseModel):
     max_dd: float = Field(default=0.08, gt=0, lt=1)
     min_hit_rate: float = Field(default=0.48, gt=0, lt=1)
     min_sample: int = Field(default=30, ge=1)
+    gate_rules: list[GateRule] | None = None
 
     @validator("timezone")
     def timezone_not_empty(cls, value: str) -> str:  # noqa: D417
@@ -0,0 +1,88 @@
+"""Benchmark the template chart renderer against the legacy pyplot renderer it replaced."""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from ..services import charts
+from ..services.panel import rsi
+
+
+def _synthetic_frame(seed: int, rows: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1_000_000.0},
+        index=pd.date_range("2024-01-01", periods=rows, freq="D"),
+    )
+
+
+def plot_chart(df: pd.DataFrame, symbol: str, out_dir: Path) -> Path:
+    """The pre-template renderer: a fresh pyplot figure and tight_layout per chart."""
+
+    fig, (ax_price, ax_rsi) = plt.subplots(
+        2, 1, figsize=(10, 6), sharex=True, gridspec_kw={"height_ratios": [3, 1]}
+    )
+    df["close"].plot(ax=ax_price, label="Close")
+    df["close"].rolling(20).mean().plot(ax=ax_price, label="SMA20")
+    ax_price.set_title(f"{symbol} Close")
+    ax_price.legend()
+
+    ax_rsi.plot(df.index, rsi(df["close"].to_numpy(dtype=float)[:, None], 14)[:, 0], label="RSI")
+    ax_rsi.axhline(70, color="red", linestyle="--", linewidth=0.8)
+    ax_rsi.axhline(30, color="green", linestyle="--", linewidth=0.8)
+    ax_rsi.set_title("RSI")
+    ax_rsi.set_ylim(0, 100)
+
+    fig.tight_layout()
+    path = out_dir / f"{symbol}_legacy.png"
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def _render_batch(seeds: list[int], out_dir: str) -> None:
+    for seed in seeds:
+        charts.render_chart(_synthetic_frame(seed), f"SYM{seed}", Path(out_dir) / f"SYM{seed}.png")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    frames = [_synthetic_frame(seed) for seed in range(args.symbols)]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        for seed, frame in enumerate(frames):
+            plot_chart(frame, f"SYM{seed}", Path(out_dir))
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for seed, frame in enumerate(frames):
+            charts.render_chart(frame, f"SYM{seed}", Path(out_dir) / f"SYM{seed}.png")
+        template = time.perf_counter() - start
+
+        chunks = [list(range(args.symbols))[i :: args.workers] for i in range(args.workers)]
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            list(pool.map(_render_batch, chunks, [out_dir] * len(chunks)))
+        pooled = time.perf_counter() - start
+
+    per_chart = 1000 / args.symbols
+    print(f"plot_chart (pyplot):      {legacy:.2f}s ({legacy * per_chart:.1f} ms/chart)")
+    print(f"ChartRenderer (template): {template:.2f}s ({template * per_chart:.1f} ms/chart)")
+    print(f"ChartRenderer x{args.workers} procs:   {pooled:.2f}s (incl. pool start-up)")
+    print(f"speed-up: {legacy / template:.1f}x single process, {legacy / pooled:.1f}x pooled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark concurrent job-result writes and job-list reads on SQLite, default vs tuned."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.database import apply_sqlite_pragmas
+from ..core.serialization import dumps_json
+from ..models.job import Job
+from ..services.persistence import result_row, write_job_results
+
+
+async def _writer(engine, jobs: int, results: int, batch_size: int) -> None:  # type: ignore[no-untyped-def]
+    for _ in range(jobs):
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            job = Job()
+            session.add(job)
+            await session.commit()
+            rows = (
+                result_row(
+                    job.id,
+                    f"T{index}",
+                    "PASS",
+                    {"sharpe": 1.2, "n": 40},
+                    {"playbook": "BREAKOUT"},
+                    None,
+                )
+                for index in range(results)
+            )
+            await write_job_results(session, rows, batch_size)
+            job.status = "SUCCESS"
+            session.add(job)
+            await session.commit()
+
+
+async def _reader(engine, stop: asyncio.Event, latencies: list[float]) -> None:  # type: ignore[no-untyped-def]
+    while not stop.is_set():
+        start = time.perf_counter()
+        async with AsyncSession(engine) as session:
+            (await session.exec(select(Job).order_by(Job.started_at.desc()).limit(50))).all()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+
+
+async def _run(path: Path, tuned: bool, args: argparse.Namespace) -> None:
+    url = f"sqlite:///{path}"
+    SQLModel.metadata.create_all(create_engine(url))
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}",
+        json_serializer=dumps_json,
+        poolclass=AsyncAdaptedQueuePool if tuned else NullPool,
+    )
+    if tuned:
+        apply_sqlite_pragmas(engine.sync_engine)
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    readers = [asyncio.create_task(_reader(engine, stop, latencies)) for _ in range(args.readers)]
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_writer(engine, args.jobs, args.results, args.batch_size) for _ in range(args.writers))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*readers)
+    await engine.dispose()
+
+    rows = args.writers * args.jobs * args.results
+    quantiles = statistics.quantiles(latencies, n=20) if len(latencies) > 1 else [0.0] * 19
+    label = "tuned (WAL, pooled)" if tuned else "default"
+    print(
+        f"{label:<26} {rows / elapsed:>9.0f} rows/s  reads={len(latencies):<6}"
+        f" p50={quantiles[9] * 1000:.1f}ms p95={quantiles[18] * 1000:.1f}ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--results", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        for tuned in (False, True):
+            asyncio.run(_run(Path(tmp) / f"bench_{int(tuned)}.db", tuned, args))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,41 +2,188 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, TypedDict
 
 import numpy as np
 import pandas as pd
 
+from .panel import build_panel
+
 logger = logging.getLogger(__name__)
 
+MIN_BARS = 60
+SWEEP_METRICS = ("n", "sharpe", "max_dd", "hit_rate")
+
+
+class BacktestSpec(TypedDict):
+    """Parameters of the momentum rule behind `quick_backtest`."""
+
+    rule: str
+    version: int
+    lookback: int
+    threshold: float
+    slippage: float
+
+
+# Everything besides the close series that determines `quick_backtest` output; part of
+# the backtest cache key, so change it whenever the rule changes.
+QUICK_BACKTEST_SPEC: BacktestSpec = {
+    "rule": "momentum",
+    "version": 2,
+    "lookback": 5,
+    "threshold": 0.0,
+    "slippage": 0.0005,
+}
+
 
 @dataclass
 class BacktestResult:
     metrics: dict[str, Any]
 
 
+@dataclass
+class SweepResult:
+    """Metrics for every (lookback, threshold, symbol) combination.
+
+    `values` has shape (len(lookbacks), len(thresholds), len(symbols), len(SWEEP_METRICS)).
+    """
+
+    symbols: list[str]
+    lookbacks: tuple[int, ...]
+    thresholds: tuple[float, ...]
+    values: np.ndarray
+
+    def metric(self, name: str) -> np.ndarray:
+        return self.values[..., SWEEP_METRICS.index(name)]
+
+    def metrics(self, symbol: str, lookback: int, threshold: float) -> dict[str, Any]:
+        index = (
+            self.lookbacks.index(lookback),
+            self.thresholds.index(threshold),
+            self.symbols.index(symbol),
+        )
+        row = self.values[index]
+        return {
+            "n": int(row[0]),
+            "sharpe": float(row[1]),
+            "max_dd": float(row[2]),
+            "hit_rate": float(row[3]),
+        }
+
+    def best(self, metric: str = "sharpe") -> dict[str, tuple[int, float]]:
+        """Return the (lookback, threshold) maximising `metric` for each symbol."""
+
+        scores = self.metric(metric).reshape(-1, len(self.symbols))
+        flat = np.nanargmax(np.where(np.isnan(scores), -np.inf, scores), axis=0)
+        width = len(self.thresholds)
+        return {
+            symbol: (self.lookbacks[index // width], self.thresholds[index % width])
+            for symbol, index in zip(self.symbols, flat, strict=True)
+        }
+
+
+def returns_from_close(close: np.ndarray) -> np.ndarray:
+    """Simple returns along axis 0; one row shorter than `close`."""
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return close[1:] / close[:-1] - 1.0
+
+
+def _rolling_mean(values: np.ndarray, valid: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` rows, NaN unless every row in the window is valid."""
+
+    zeros = np.zeros((1,) + values.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, values, 0.0), axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] >= window:
+        full = (counts[window:] - counts[:-window]) == window
+        out[window - 1 :] = np.where(full, (sums[window:] - sums[:-window]) / window, np.nan)
+    return out
+
+
+def momentum_returns(returns: np.ndarray, lookback: int, threshold: float = 0.0) -> np.ndarray:
+    """Per-bar returns of the momentum rule on a (time, symbol) returns matrix; NaN rows earn 0."""
+
+    valid = ~np.isnan(returns)
+    signal = _rolling_mean(returns, valid, lookback) > threshold
+    position = np.concatenate([np.zeros_like(signal[:1]), signal[:-1]])
+    return position * np.where(valid, returns, 0.0)
+
+
+def sweep_backtest(
+    returns: np.ndarray,
+    lookbacks: Sequence[int],
+    thresholds: Sequence[float] = (0.0,),
+    symbols: Sequence[str] | None = None,
+    slippage: float = 0.0,
+) -> SweepResult:
+    """Backtest the momentum rule for every lookback/threshold pair and symbol at once.
+
+    `returns` is (time, symbol) with NaN where a symbol has no bar. The rule goes long
+    for the next bar when the trailing mean return over `lookback` bars exceeds the
+    threshold, exactly like `quick_backtest`, and pays `slippage` on every bar where its
+    position changes. Work is batched per lookback over all thresholds and symbols, so
+    memory stays at O(thresholds x time x symbols).
+    """
+
+    returns = np.asarray(returns, dtype=float)
+    valid = ~np.isnan(returns)
+    filled = np.where(valid, returns, 0.0)
+    n = valid.sum(axis=0)
+    limits = np.asarray(thresholds, dtype=float)[:, None, None]
+    shape = (len(lookbacks), len(thresholds), returns.shape[1], len(SWEEP_METRICS))
+    values = np.full(shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for row, lookback in enumerate(lookbacks):
+            signal = _rolling_mean(returns, valid, lookback)[None] > limits
+            position = np.concatenate([np.zeros_like(signal[:, :1]), signal[:, :-1]], axis=1)
+            trades = np.abs(np.diff(position, axis=1, prepend=0))
+            strategy = position * filled[None] - slippage * trades
+            mean = strategy.sum(axis=1) / n
+            variance = (np.square(strategy).sum(axis=1) - n * np.square(mean)) / (n - 1)
+            sharpe = np.sqrt(252) * mean / (np.sqrt(np.maximum(variance, 0.0)) + 1e-6)
+            equity = np.cumprod(1.0 + strategy, axis=1)
+            peak = np.maximum.accumulate(equity, axis=1)
+            max_dd = ((peak - equity) / peak).max(axis=1)
+            hit_rate = ((strategy > 0) & valid[None]).sum(axis=1) / n
+            counts = np.broadcast_to(n, mean.shape)
+            values[row] = np.stack([counts, sharpe, max_dd, hit_rate], axis=-1)
+    if symbols is not None:
+        names = list(symbols)
+    else:
+        names = [str(index) for index in range(returns.shape[1])]
+    return SweepResult(
+        symbols=names, lookbacks=tuple(lookbacks), thresholds=tuple(thresholds), values=values
+    )
+
+
+def sweep_frames(
+    frames: dict[str, pd.DataFrame],
+    lookbacks: Sequence[int],
+    thresholds: Sequence[float] = (0.0,),
+) -> SweepResult:
+    """Run `sweep_backtest` over OHLCV frames, aligned on each symbol's latest bar."""
+
+    panel = build_panel(frames)
+    return sweep_backtest(returns_from_close(panel.close), lookbacks, thresholds, panel.symbols)
+
+
 def quick_backtest(df: pd.DataFrame) -> BacktestResult:
     """Run a naive momentum backtest as sanity check."""
 
-    if df.shape[0] < 60:
+    if df.shape[0] < MIN_BARS:
         return BacktestResult(metrics={"n": 0, "status": "INSUFFICIENT_DATA"})
-    prices = df["close"].pct_change().dropna()
-    signal = (prices.rolling(5).mean() > 0).astype(int)
-    returns = signal.shift(1).fillna(0) * prices
-    equity = (1 + returns).cumprod()
-    if equity.empty:
+    returns = returns_from_close(df["close"].to_numpy(dtype=float)[:, None])
+    returns = returns[~np.isnan(returns[:, 0])]
+    if returns.shape[0] == 0:
         return BacktestResult(metrics={"n": 0, "status": "INSUFFICIENT_DATA"})
-    sharpe = np.sqrt(252) * returns.mean() / (returns.std() + 1e-6)
-    drawdown = (equity.cummax() - equity) / equity.cummax()
-    max_dd = drawdown.max()
-    hit_rate = (returns > 0).mean()
-    metrics = {
-        "n": int(len(returns)),
-        "status": "OK",
-        "sharpe": float(sharpe),
-        "max_dd": float(max_dd),
-        "hit_rate": float(hit_rate),
-        "slippage_used": 0.0005,
-    }
-    return BacktestResult(metrics=metrics)
+    lookback, threshold = QUICK_BACKTEST_SPEC["lookback"], QUICK_BACKTEST_SPEC["threshold"]
+    slippage = QUICK_BACKTEST_SPEC["slippage"]
+    sweep = sweep_backtest(
+        returns, lookbacks=(lookback,), thresholds=(threshold,), slippage=slippage
+    )
+    metrics = sweep.metrics("0", lookback, threshold)
+    return BacktestResult(metrics={**metrics, "status": "OK", "slippage_used": slippage})
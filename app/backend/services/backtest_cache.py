@@ -0,0 +1,48 @@
+"""Backtest metrics memoised on a fingerprint of the input bars."""
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import get_settings
+from ..models.backtest_cache import BacktestCache
+from .backtest import QUICK_BACKTEST_SPEC
+from .result_cache import load_entries, store_entries
+
+
+def backtest_key(symbol: str, df: pd.DataFrame, spec: Mapping[str, Any] | None = None) -> str:
+    """Hash the symbol, strategy spec and the exact close series (values, length, last bar)."""
+
+    digest = hashlib.sha256()
+    digest.update(symbol.encode())
+    digest.update(b"\0")
+    digest.update(json.dumps(spec or QUICK_BACKTEST_SPEC, sort_keys=True).encode())
+    digest.update(b"\0")
+    digest.update(f"{len(df)}|{df.index[-1].isoformat() if len(df) else ''}".encode())
+    digest.update(np.ascontiguousarray(df["close"].to_numpy(dtype=float)).tobytes())
+    return digest.hexdigest()
+
+
+def load_backtests(keys: dict[str, str]) -> dict[str, dict[str, Any]]:
+    """Return cached metrics by symbol for the given {symbol: key} mapping."""
+
+    return load_entries(BacktestCache, keys, "metrics", get_settings().backtest_cache_ttl)
+
+
+def store_backtests(keys: dict[str, str], metrics: dict[str, dict[str, Any]]) -> None:
+    """Persist metrics, then evict expired rows and the oldest rows above the entry budget."""
+
+    settings = get_settings()
+    entries = [
+        BacktestCache(key=keys[symbol], symbol=symbol, metrics=json.dumps(values))
+        for symbol, values in metrics.items()
+        if symbol in keys
+    ]
+    store_entries(
+        BacktestCache, entries, settings.backtest_cache_ttl, settings.backtest_cache_max_entries
+    )
@@ -0,0 +1,257 @@
+"""On-demand chart rendering backed by a size-bounded LRU file cache."""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+import matplotlib.dates as mdates
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..core.config import get_settings
+from .market_data import BarStore, get_bar_store
+from .panel import rsi
+
+logger = logging.getLogger(__name__)
+
+CHARTS_DIR = Path("charts")
+
+_KEY_PATTERN = re.compile(
+    r"^(?P<symbol>[A-Za-z0-9.=^_-]+)_(?P<ts>\d{12})"
+    r"_b(?P<bars>\d+)s(?P<sma>\d+)r(?P<rsi>\d+)\.png$"
+)
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    bars: int = 120
+    sma: int = 20
+    rsi: int = 14
+
+    @property
+    def slug(self) -> str:
+        return f"b{self.bars}s{self.sma}r{self.rsi}"
+
+
+def chart_key(symbol: str, last_bar: pd.Timestamp, spec: ChartSpec | None = None) -> str:
+    """Return the cache filename identifying a chart of `symbol` up to `last_bar`."""
+
+    spec = spec or ChartSpec()
+    return f"{symbol}_{pd.Timestamp(last_bar).strftime('%Y%m%d%H%M')}_{spec.slug}.png"
+
+
+def parse_chart_key(filename: str) -> tuple[str, pd.Timestamp, ChartSpec]:
+    match = _KEY_PATTERN.match(filename)
+    if not match:
+        raise ValueError(f"Invalid chart key: {filename}")
+    spec = ChartSpec(bars=int(match["bars"]), sma=int(match["sma"]), rsi=int(match["rsi"]))
+    return match["symbol"], pd.to_datetime(match["ts"], format="%Y%m%d%H%M"), spec
+
+
+class ChartCache:
+    """PNG files on disk, evicted least-recently-used first once over `max_bytes`.
+
+    The bytes on disk are tracked in-process so a put only rescans the directory once
+    the running total exceeds the budget, and eviction then goes down to `low_water`
+    of it so a full cache is not rescanned on every render. The API and worker
+    processes share the directory; files one writes are seen by the other on its next
+    scan.
+    """
+
+    low_water = 0.8
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total: int | None = None
+
+    def get(self, key: str) -> Path | None:
+        # Only plain PNG file names directly under the root; no path traversal.
+        if Path(key).name != key or key.startswith(".") or not key.endswith(".png"):
+            return None
+        path = self.root / key
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path if path.is_file() else None
+
+    def put(self, key: str, render: Callable[[Path], None]) -> Path:
+        """Render into a temporary file via `render(path)` and publish it atomically.
+
+        Callers rendering the same key concurrently each write their own temporary file;
+        whoever finds the key already published keeps that file instead of its own.
+        """
+
+        path = self.root / key
+        tmp_path = path.with_name(f".{key}.{os.getpid()}.{uuid4().hex}.tmp")
+        try:
+            render(tmp_path)
+            if path.is_file():
+                return path
+            size = tmp_path.stat().st_size
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        with self._lock:
+            if self._total is not None and self._total + size <= self.max_bytes:
+                self._total += size
+                return path
+        self.evict()
+        return path
+
+    def evict(self) -> None:
+        """Rescan the directory and, if over `max_bytes`, drop the oldest files down to `low_water`.
+
+        Files another process deletes mid-scan are skipped rather than raising.
+        """
+
+        files = []
+        for entry in self.root.glob("*.png"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry))
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes if total <= self.max_bytes else int(self.max_bytes * self.low_water)
+        for _, size, entry in sorted(files):
+            if total <= target:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+        with self._lock:
+            self._total = total
+
+
+class ChartRenderer:
+    """Agg-only figure built once per spec; renders by swapping line data.
+
+    Creating figures through pyplot and running `tight_layout` dominates the cost of a
+    chart, so the artists are created once and only their data, limits and title
+    change between renders. Instances are not shared across processes; within a
+    process a lock serialises access to the figure.
+    """
+
+    def __init__(self, spec: ChartSpec) -> None:
+        self.spec = spec
+        self.lock = threading.Lock()
+        self.figure = Figure(figsize=(10, 6))
+        FigureCanvasAgg(self.figure)
+        grid = self.figure.add_gridspec(2, 1, height_ratios=[3, 1])
+        self.ax_price = self.figure.add_subplot(grid[0])
+        self.ax_rsi = self.figure.add_subplot(grid[1], sharex=self.ax_price)
+        (self.close_line,) = self.ax_price.plot([], [], label="Close")
+        (self.sma_line,) = self.ax_price.plot([], [], label=f"SMA{spec.sma}")
+        self.ax_price.legend(loc="upper left")
+        (self.rsi_line,) = self.ax_rsi.plot([], [], label="RSI")
+        self.ax_rsi.axhline(70, color="red", linestyle="--", linewidth=0.8)
+        self.ax_rsi.axhline(30, color="green", linestyle="--", linewidth=0.8)
+        self.ax_rsi.set_title("RSI")
+        self.ax_rsi.set_ylim(0, 100)
+        locator = mdates.AutoDateLocator()
+        self.ax_rsi.xaxis.set_major_locator(locator)
+        self.ax_rsi.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+        self.ax_price.tick_params(labelbottom=False)
+        # Fixed margins instead of tight_layout: the layout is computed once, not per render.
+        self.figure.subplots_adjust(left=0.08, right=0.98, top=0.95, bottom=0.07, hspace=0.25)
+
+    def render(self, df: pd.DataFrame, symbol: str, path: Path) -> None:
+        close = df["close"].to_numpy(dtype=float)
+        x = mdates.date2num(df.index.to_pydatetime())
+        sma = df["close"].rolling(self.spec.sma).mean().to_numpy()
+        rsi_values = rsi(close[:, None], self.spec.rsi)[:, 0]
+        with self.lock:
+            self.close_line.set_data(x, close)
+            self.sma_line.set_data(x, sma)
+            self.rsi_line.set_data(x, rsi_values)
+            if len(x) > 1:
+                self.ax_price.set_xlim(x[0], x[-1])
+            low, high = np.nanmin(close), np.nanmax(close)
+            pad = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+            self.ax_price.set_ylim(low - pad, high + pad)
+            self.ax_price.set_title(f"{symbol} Close")
+            # Fast zlib level: PNG encoding is a large share of render time, size barely changes.
+            self.figure.savefig(path, format="png", pil_kwargs={"compress_level": 1})
+
+
+_renderers: dict[ChartSpec, ChartRenderer] = {}
+
+
+def get_renderer(spec: ChartSpec) -> ChartRenderer:
+    """Return this process's renderer for `spec`, building the template on first use."""
+
+    renderer = _renderers.get(spec)
+    if renderer is None:
+        renderer = _renderers.setdefault(spec, ChartRenderer(spec))
+    return renderer
+
+
+def render_chart(df: pd.DataFrame, symbol: str, path: Path, spec: ChartSpec | None = None) -> None:
+    """Render close/SMA and RSI panels to a PNG at `path`."""
+
+    get_renderer(spec or ChartSpec()).render(df, symbol, path)
+
+
+_chart_cache: ChartCache | None = None
+
+
+def get_chart_cache() -> ChartCache:
+    global _chart_cache
+    if _chart_cache is None:
+        _chart_cache = ChartCache(CHARTS_DIR, get_settings().chart_cache_max_bytes)
+    return _chart_cache
+
+
+def ensure_chart(key: str, store: BarStore | None = None, cache: ChartCache | None = None) -> Path:
+    """Return the PNG for `key`, rendering it from stored bars on a cache miss.
+
+    Files already in the cache are served whatever their name, so PNGs written under the
+    older `SYMBOL_YYYYmmddHHMMSS.png` naming keep resolving. Raises ValueError for
+    malformed keys and LookupError when the bars the key refers to are not in the bar store.
+    """
+
+    cache = cache or get_chart_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    symbol, last_bar, spec = parse_chart_key(key)
+    bars = (store or get_bar_store()).load(symbol, "1d")
+    if bars is None or bars.empty:
+        raise LookupError(f"No bars stored for {symbol}")
+    window = bars[bars.index.floor("min") <= last_bar].tail(spec.bars)
+    if window.empty or window.index[-1].floor("min") != last_bar:
+        raise LookupError(f"Bar {last_bar} not available for {symbol}")
+    logger.info("Rendering chart %s", key)
+    return cache.put(key, lambda path: render_chart(window, symbol, path, spec))
+
+
+def prerender_charts(keys: Iterable[str], executor: Executor) -> list[str]:
+    """Render charts eagerly across `executor`, returning the keys that rendered."""
+
+    keys = list(keys)
+    rendered: list[str] = []
+    for key, ok in zip(keys, executor.map(_prerender_one, keys), strict=True):
+        if ok:
+            rendered.append(key)
+    return rendered
+
+
+def _prerender_one(key: str) -> bool:
+    try:
+        ensure_chart(key)
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Failed to render chart %s: %s", key, exc)
+        return False
+    return True
@@ -1,32 +1,277 @@
-"""Gatekeeper applying risk filters."""
+"""Gatekeeper applying risk filters.
+
+Rules are declarative: each blocks a ticker when `column <op> threshold` holds, where
+the threshold is a literal or the name of a settings field. A rule set is compiled
+once per settings snapshot and evaluated as boolean masks over a column table built
+from every ticker's features and backtest metrics.
+"""
 from __future__ import annotations
 
+import logging
+import operator
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 from typing import Any
 
-from ..core.config import get_settings
-
-
-def apply_gatekeeper(features: dict[str, Any], backtest_metrics: dict[str, Any]) -> tuple[str, list[str]]:
-    """Return PASS/BLOCK decision with reasons."""
-
-    settings = get_settings()
-    reasons: list[str] = []
-    spread = float(features.get("spread_pct", 0.0))
-    vol_rel = float(features.get("vol_rel", 0.0))
-    if spread > settings.max_spread_pct:
-        reasons.append("spread above threshold")
-    if vol_rel < settings.min_vol_rel:
-        reasons.append("vol_rel below minimum")
-    if backtest_metrics.get("status") == "INSUFFICIENT_DATA":
-        reasons.append("insufficient data")
-    else:
-        if backtest_metrics.get("n", 0) < settings.min_sample:
-            reasons.append("sample too small")
-        if float(backtest_metrics.get("sharpe", -1.0)) < settings.min_sharpe:
-            reasons.append("sharpe below min")
-        if float(backtest_metrics.get("max_dd", 1.0)) > settings.max_dd:
-            reasons.append("drawdown above max")
-        if float(backtest_metrics.get("hit_rate", 0.0)) < settings.min_hit_rate:
-            reasons.append("hit rate below min")
-    status = "PASS" if not reasons else "BLOCK"
-    return status, reasons
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+
+from ..core.config import GateRule, Settings
+from .settings_provider import current_settings
+
+logger = logging.getLogger(__name__)
+
+OPERATORS: dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+# Row scopes a rule can be limited to; see `GateTable.scopes`.
+SCOPES = ("all", "backtest", "point", "bounds")
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Block a ticker when `column op threshold`; `threshold` may name a settings field."""
+
+    name: str
+    column: str
+    op: str
+    threshold: float | str
+    reason: str
+    default: float = float("nan")
+    scope: str = "all"
+
+
+BUILTIN_RULES = (
+    Rule("spread", "spread_pct", ">", "max_spread_pct", "spread above threshold", default=0.0),
+    Rule("vol_rel", "vol_rel", "<", "min_vol_rel", "vol_rel below minimum", default=0.0),
+    Rule("insufficient_data", "has_backtest", "==", 0.0, "insufficient data"),
+    Rule("sample", "n", "<", "min_sample", "sample too small", default=0.0, scope="backtest"),
+    Rule("sharpe", "sharpe", "<", "min_sharpe", "sharpe below min", default=-1.0, scope="point"),
+    Rule(
+        "sharpe_lo", "sharpe_lo", "<", "min_sharpe", "sharpe lower bound below min", scope="bounds"
+    ),
+    Rule("max_dd", "max_dd", ">", "max_dd", "drawdown above max", default=1.0, scope="backtest"),
+    Rule(
+        "hit_rate",
+        "hit_rate",
+        "<",
+        "min_hit_rate",
+        "hit rate below min",
+        default=0.0,
+        scope="point",
+    ),
+    Rule(
+        "hit_rate_lo",
+        "hit_rate_lo",
+        "<",
+        "min_hit_rate",
+        "hit rate lower bound below min",
+        default=0.0,
+        scope="bounds",
+    ),
+)
+
+
+@dataclass
+class GateTable:
+    """Columns over tickers, from one DataFrame of the merged per-ticker dicts."""
+
+    tickers: list[str]
+    frame: pd.DataFrame
+    present: pd.DataFrame
+    scopes: dict[str, np.ndarray]
+
+    @classmethod
+    def build(
+        cls,
+        features: Mapping[str, dict[str, Any]],
+        backtests: Mapping[str, dict[str, Any]],
+        gate_on_lower_bound: bool = False,
+    ) -> GateTable:
+        tickers = list(backtests)
+        rows = [{**features.get(ticker, {}), **backtests[ticker]} for ticker in tickers]
+        # The DataFrame constructor, unlike `from_records` on pandas 2.x, accepts an empty
+        # index, so an empty watchlist yields an empty table rather than an error.
+        frame = pd.DataFrame(rows, index=pd.RangeIndex(len(rows)))
+        # Which keys each row actually carries: absent values take the rule default,
+        # while present NaNs stay NaN and never trigger a rule.
+        present = pd.DataFrame(
+            [dict.fromkeys(row, True) for row in rows], index=pd.RangeIndex(len(rows))
+        )
+        if "status" in frame.columns:
+            status = frame["status"]
+        else:
+            status = pd.Series(None, index=frame.index, dtype=object)
+        has_backtest = (status != "INSUFFICIENT_DATA").to_numpy(dtype=bool)
+        if gate_on_lower_bound and "sharpe_lo" in present.columns:
+            has_bounds = present["sharpe_lo"].notna().to_numpy(dtype=bool)
+        else:
+            has_bounds = np.zeros(len(tickers), dtype=bool)
+        frame["has_backtest"] = has_backtest.astype(float)
+        present["has_backtest"] = True
+        scopes = {
+            "all": np.ones(len(tickers), dtype=bool),
+            "backtest": has_backtest,
+            "point": has_backtest & ~has_bounds,
+            "bounds": has_backtest & has_bounds,
+        }
+        return cls(tickers=tickers, frame=frame, present=present, scopes=scopes)
+
+    def column(self, name: str, default: float) -> np.ndarray:
+        """Float column `name`; missing or non-numeric cells become `default`."""
+
+        if name not in self.frame.columns:
+            return np.full(len(self.tickers), default, dtype=float)
+        raw = self.frame[name]
+        values = pd.to_numeric(raw, errors="coerce")
+        unusable = self.present[name].isna() | (values.isna() & raw.notna())
+        return values.mask(unusable, default).to_numpy(dtype=float)
+
+
+@dataclass
+class GateResult:
+    """Per-ticker status plus a (ticker x rule) matrix of triggered rules."""
+
+    tickers: list[str]
+    rules: tuple[Rule, ...]
+    blocked: np.ndarray
+
+    def status(self, row: int) -> str:
+        return "BLOCK" if self.blocked[row].any() else "PASS"
+
+    def reasons(self, row: int) -> list[str]:
+        return [rule.reason for rule, hit in zip(self.rules, self.blocked[row], strict=True) if hit]
+
+    def codes(self, row: int) -> list[str]:
+        return [rule.name for rule, hit in zip(self.rules, self.blocked[row], strict=True) if hit]
+
+    def as_dict(self) -> dict[str, tuple[str, list[str]]]:
+        return {
+            ticker: (self.status(row), self.reasons(row)) for row, ticker in enumerate(self.tickers)
+        }
+
+
+@dataclass
+class CompiledRules:
+    """Rules with thresholds resolved against one settings snapshot."""
+
+    rules: tuple[Rule, ...]
+    thresholds: tuple[float, ...]
+    gate_on_lower_bound: bool
+
+    def evaluate(self, table: GateTable) -> GateResult:
+        blocked = np.zeros((len(table.tickers), len(self.rules)), dtype=bool)
+        columns: dict[tuple[str, float], np.ndarray] = {}
+        for index, (rule, threshold) in enumerate(zip(self.rules, self.thresholds, strict=True)):
+            key = (rule.column, rule.default)
+            if key not in columns:
+                columns[key] = table.column(rule.column, rule.default)
+            with np.errstate(invalid="ignore"):
+                hits = OPERATORS[rule.op](columns[key], threshold)
+            blocked[:, index] = hits & table.scopes[rule.scope]
+        return GateResult(tickers=table.tickers, rules=self.rules, blocked=blocked)
+
+
+def parse_rule(data: Mapping[str, Any]) -> Rule:
+    """Build a Rule from a settings entry, raising ValueError for invalid operators or scopes."""
+
+    rule = Rule(
+        name=str(data["name"]),
+        column=str(data["column"]),
+        op=str(data["op"]),
+        threshold=data["threshold"],
+        reason=str(data.get("reason") or _default_reason(data)),
+        default=float(data["default"]) if data.get("default") is not None else float("nan"),
+        scope=str(data.get("scope", "all")),
+    )
+    if rule.op not in OPERATORS:
+        raise ValueError(f"Unknown operator {rule.op!r} in rule {rule.name}")
+    if rule.scope not in SCOPES:
+        raise ValueError(f"Unknown scope {rule.scope!r} in rule {rule.name}")
+    return rule
+
+
+def _default_reason(data: Mapping[str, Any]) -> str:
+    return f"{data['column']} {data['op']} {_format_threshold(data['threshold'])}"
+
+
+def _format_threshold(threshold: float | str) -> str:
+    return f"{threshold:g}" if isinstance(threshold, float) else str(threshold)
+
+
+def compile_rules(settings: Settings) -> CompiledRules:
+    """Resolve the built-in rules plus `settings.gate_rules` into numeric thresholds."""
+
+    rules = BUILTIN_RULES + tuple(_valid_rules(settings.gate_rules or []))
+    if not settings.gate_on_lower_bound:
+        rules = tuple(rule for rule in rules if rule.scope != "bounds")
+    thresholds = tuple(
+        float(getattr(settings, rule.threshold))
+        if isinstance(rule.threshold, str)
+        else float(rule.threshold)
+        for rule in rules
+    )
+    return CompiledRules(
+        rules=rules, thresholds=thresholds, gate_on_lower_bound=settings.gate_on_lower_bound
+    )
+
+
+def _valid_rules(entries: list[dict[str, Any]]) -> list[Rule]:
+    """Parse extra rules, skipping (and logging) any that do not validate.
+
+    Env rules are validated when Settings loads and saved rules by SettingUpdate; this
+    guards rows written before a validation rule existed, so one bad entry cannot fail
+    every run.
+    """
+
+    rules = []
+    for entry in entries:
+        try:
+            rules.append(parse_rule(GateRule.parse_obj(entry).dict()))
+        except (ValidationError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring invalid gate rule %r: %s", entry, exc)
+    return rules
+
+
+_compiled: tuple[Settings, CompiledRules] | None = None
+
+
+def get_compiled_rules(settings: Settings) -> CompiledRules:
+    """Return the compiled rule set for `settings`, recompiling only when the snapshot changes."""
+
+    global _compiled
+    cached = _compiled
+    if cached is not None and cached[0] is settings:
+        return cached[1]
+    compiled = compile_rules(settings)
+    _compiled = (settings, compiled)
+    return compiled
+
+
+def evaluate_watchlist(
+    features: Mapping[str, dict[str, Any]],
+    backtests: Mapping[str, dict[str, Any]],
+    settings: Settings | None = None,
+) -> GateResult:
+    """Gate every ticker in `backtests` in one vectorised pass."""
+
+    compiled = get_compiled_rules(settings or current_settings())
+    return compiled.evaluate(GateTable.build(features, backtests, compiled.gate_on_lower_bound))
+
+
+def apply_gatekeeper(
+    features: dict[str, Any],
+    backtest_metrics: dict[str, Any],
+    settings: Settings | None = None,
+) -> tuple[str, list[str]]:
+    """Return PASS/BLOCK decision with reasons, using the run's settings unless given."""
+
+    result = evaluate_watchlist({"": features}, {"": backtest_metrics}, settings)
+    return result.status(0), result.reasons(0)
+
@@ -0,0 +1,217 @@
+"""Stateful per-symbol indicators updated in O(1) per new bar."""
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+import pandas as pd
+
+from .market_data import BarStore, get_bar_store
+
+STATE_NAME = "indicators"
+
+
+@dataclass
+class WilderState:
+    """Adjusted-EWM accumulator equivalent to `panel.wilder_mean` for one series."""
+
+    length: int = 14
+    weighted: float = 0.0
+    total: float = 0.0
+    count: int = 0
+
+    def push(self, value: float) -> None:
+        decay = 1.0 - 1.0 / self.length
+        self.weighted *= decay
+        self.total *= decay
+        if not math.isnan(value):
+            self.weighted += value
+            self.total += 1.0
+            self.count += 1
+
+    def peek(self, value: float) -> float:
+        """Return the average as if `value` were pushed, without mutating state."""
+
+        probe = WilderState(self.length, self.weighted, self.total, self.count)
+        probe.push(value)
+        return probe.value()
+
+    def value(self) -> float:
+        if self.count < self.length or self.total == 0:
+            return math.nan
+        return self.weighted / self.total
+
+
+@dataclass
+class RollingWindow:
+    """Fixed-size window of committed values with a running sum.
+
+    NaN bars (missing closes or volumes) are kept in the window but not summed; the
+    mean is NaN while one is inside it, like `panel.trailing_mean`, and recovers once
+    it is evicted.
+    """
+
+    size: int
+    values: deque = field(default_factory=deque)
+    total: float = 0.0
+    missing: int = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.size:
+            evicted = self.values.popleft()
+            if math.isnan(evicted):
+                self.missing -= 1
+            else:
+                self.total -= evicted
+        self.values.append(value)
+        if math.isnan(value):
+            self.missing += 1
+        else:
+            self.total += value
+
+    def mean_with(self, latest: float) -> float:
+        """Mean over the committed values plus `latest`, NaN until the window is full."""
+
+        if len(self.values) < self.size or self.missing:
+            return math.nan
+        return (self.total + latest) / (self.size + 1)
+
+
+@dataclass
+class IncrementalIndicators:
+    """Indicator state for committed bars plus the latest, still revisable, bar.
+
+    The newest bar can be re-delivered with updated values (an intraday or partial
+    session), so it is kept as `pending` and only folded into the smoothing state once
+    a later bar arrives.
+    """
+
+    prev_close: float = math.nan
+    gains: WilderState = field(default_factory=WilderState)
+    losses: WilderState = field(default_factory=WilderState)
+    true_range: WilderState = field(default_factory=WilderState)
+    closes_20: RollingWindow = field(default_factory=lambda: RollingWindow(19))
+    closes_50: RollingWindow = field(default_factory=lambda: RollingWindow(49))
+    volumes_20: RollingWindow = field(default_factory=lambda: RollingWindow(19))
+    pending_timestamp: str | None = None
+    pending: dict[str, float] | None = None
+
+    def update(self, timestamp: pd.Timestamp, bar: dict[str, float]) -> None:
+        stamp = pd.Timestamp(timestamp).isoformat()
+        if self.pending_timestamp is not None and stamp < self.pending_timestamp:
+            return
+        if self.pending is not None and stamp != self.pending_timestamp:
+            self._commit(self.pending)
+        self.pending_timestamp = stamp
+        self.pending = {
+            name: float(bar[name]) for name in ("open", "high", "low", "close", "volume")
+        }
+
+    def _commit(self, bar: dict[str, float]) -> None:
+        delta = bar["close"] - self.prev_close
+        self.gains.push(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        self.losses.push(max(-delta, 0.0) if not math.isnan(delta) else math.nan)
+        self.true_range.push(_true_range(bar, self.prev_close))
+        self.closes_20.push(bar["close"])
+        self.closes_50.push(bar["close"])
+        self.volumes_20.push(bar["volume"])
+        self.prev_close = bar["close"]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return the latest features shaped like `features.compute_indicators` output."""
+
+        if self.pending is None:
+            return {}
+        bar = self.pending
+        delta = bar["close"] - self.prev_close
+        gain = self.gains.peek(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        loss = self.losses.peek(max(-delta, 0.0) if not math.isnan(delta) else math.nan)
+        atr = self.true_range.peek(_true_range(bar, self.prev_close))
+        volume_avg = self.volumes_20.mean_with(bar["volume"])
+        return {
+            **bar,
+            "rsi": 100.0 * gain / (gain + loss) if gain + loss else math.nan,
+            "atr": atr,
+            "atr_pct": atr / bar["close"],
+            "gap_pct": bar["close"] / self.prev_close - 1.0,
+            "vol_rel": bar["volume"] / volume_avg if volume_avg else math.nan,
+            "spread_pct": (bar["high"] - bar["low"]) / bar["close"],
+            "levels": {
+                "sma_20": self.closes_20.mean_with(bar["close"]),
+                "sma_50": self.closes_50.mean_with(bar["close"]),
+            },
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "prev_close": self.prev_close,
+            "gains": vars(self.gains),
+            "losses": vars(self.losses),
+            "true_range": vars(self.true_range),
+            "closes_20": list(self.closes_20.values),
+            "closes_50": list(self.closes_50.values),
+            "volumes_20": list(self.volumes_20.values),
+            "pending_timestamp": self.pending_timestamp,
+            "pending": self.pending,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> IncrementalIndicators:
+        return cls(
+            prev_close=data["prev_close"],
+            gains=WilderState(**data["gains"]),
+            losses=WilderState(**data["losses"]),
+            true_range=WilderState(**data["true_range"]),
+            closes_20=_window(19, data["closes_20"]),
+            closes_50=_window(49, data["closes_50"]),
+            volumes_20=_window(19, data["volumes_20"]),
+            pending_timestamp=data["pending_timestamp"],
+            pending=data["pending"],
+        )
+
+
+def _true_range(bar: dict[str, float], prev_close: float) -> float:
+    if math.isnan(prev_close):
+        return math.nan
+    return max(
+        bar["high"] - bar["low"], abs(bar["high"] - prev_close), abs(prev_close - bar["low"])
+    )
+
+
+def _window(size: int, values: list[float]) -> RollingWindow:
+    window = RollingWindow(size=size)
+    for value in values:
+        window.push(value)
+    return window
+
+
+def update_indicator_state(
+    symbol: str,
+    df: pd.DataFrame,
+    interval: str = "1d",
+    store: BarStore | None = None,
+) -> dict[str, Any]:
+    """Feed bars newer than the persisted state and return the latest features.
+
+    The state is rebuilt from the full frame when none exists or when the frame no
+    longer reaches back to the state's pending bar (e.g. after a gap in the store).
+    """
+
+    store = store or get_bar_store()
+    data = store.load_state(symbol, interval, STATE_NAME)
+    state = IncrementalIndicators.from_dict(data) if data else None
+    if (
+        state is None
+        or state.pending_timestamp is None
+        or pd.Timestamp(state.pending_timestamp) < df.index[0]
+    ):
+        state = IncrementalIndicators()
+        bars = df
+    else:
+        bars = df[df.index >= pd.Timestamp(state.pending_timestamp)]
+    for timestamp, row in zip(bars.index, bars.to_dict("records"), strict=True):
+        state.update(timestamp, row)
+    store.save_state(symbol, interval, STATE_NAME, state.to_dict())
+    return state.snapshot()
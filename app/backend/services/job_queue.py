@@ -0,0 +1,309 @@
+"""Durable, SQLite-backed queue of pipeline runs and the worker loop that drains it.
+
+The API only enqueues; `worker.py` processes claim runs one at a time, so the number of
+concurrent pipelines equals the number of worker processes. Claims are a conditional
+UPDATE on the row's status, which SQLite serialises, so two workers never take the
+same run. Workers heartbeat while a run is in flight; a claim whose heartbeat is older
+than QUEUE_STALE_AFTER (a crashed or killed worker) is re-queued, up to
+QUEUE_MAX_ATTEMPTS claims in total. A worker whose heartbeat finds the claim gone
+cancels its run, and the run's final commit re-checks the claim in the same
+transaction, so a re-queued job is only ever completed by its current owner.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..core.database import async_session_scope
+from ..models.job import Job
+from ..models.queued_run import QueuedRun
+from .pipeline import PipelineAborted, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+QUEUE_STATUSES = ("QUEUED", "CLAIMED", "DONE", "FAILED")
+# Claims sampled for the latency figures of `queue_stats`.
+_LATENCY_SAMPLE = 200
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def enqueue_run(session: AsyncSession, ticker: str | None = None) -> Job:
+    """Create a QUEUED job and its queue entry in one transaction."""
+
+    job = Job(status="QUEUED")
+    session.add(job)
+    await session.flush()
+    session.add(QueuedRun(job_id=job.id, ticker=ticker))
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def claim_next(session: AsyncSession, worker_id: str) -> QueuedRun | None:
+    """Claim the oldest queued run for `worker_id`, or return None when the queue is empty."""
+
+    while True:
+        candidate = (
+            await session.exec(
+                select(QueuedRun.id)
+                .where(QueuedRun.status == "QUEUED")
+                .order_by(QueuedRun.enqueued_at, QueuedRun.id)
+                .limit(1)
+            )
+        ).first()
+        if candidate is None:
+            return None
+        now = datetime.utcnow()
+        claimed = await session.execute(
+            update(QueuedRun)
+            .where(QueuedRun.id == candidate, QueuedRun.status == "QUEUED")
+            .values(
+                status="CLAIMED",
+                worker_id=worker_id,
+                attempts=QueuedRun.attempts + 1,
+                claimed_at=now,
+                heartbeat_at=now,
+            )
+        )
+        await session.commit()
+        if claimed.rowcount == 1:
+            return await session.get(QueuedRun, candidate)
+        # Another worker won the race for this row; try the next one.
+
+
+async def heartbeat(
+    session: AsyncSession, run_id: int, worker_id: str, commit: bool = True
+) -> bool:
+    """Refresh the claim; False when the run was re-queued or finished elsewhere.
+
+    With `commit=False` the update joins the caller's transaction, which then holds
+    the claim row until it commits.
+    """
+
+    result = await session.execute(
+        update(QueuedRun)
+        .where(
+            QueuedRun.id == run_id,
+            QueuedRun.worker_id == worker_id,
+            QueuedRun.status == "CLAIMED",
+        )
+        .values(heartbeat_at=datetime.utcnow())
+    )
+    if commit:
+        await session.commit()
+    return result.rowcount == 1
+
+
+async def finish_run(
+    session: AsyncSession, run_id: int, worker_id: str, error: str | None = None
+) -> None:
+    await session.execute(
+        update(QueuedRun)
+        .where(
+            QueuedRun.id == run_id,
+            QueuedRun.worker_id == worker_id,
+            QueuedRun.status == "CLAIMED",
+        )
+        .values(status="FAILED" if error else "DONE", finished_at=datetime.utcnow(), error=error)
+    )
+    await session.commit()
+
+
+async def requeue_stale(session: AsyncSession, stale_after: float, max_attempts: int) -> int:
+    """Release claims whose worker stopped heartbeating; fail those out of attempts."""
+
+    cutoff = datetime.utcnow() - timedelta(seconds=stale_after)
+    stale = (QueuedRun.status == "CLAIMED", QueuedRun.heartbeat_at < cutoff)
+    exhausted = await session.exec(
+        select(QueuedRun.job_id).where(*stale, QueuedRun.attempts >= max_attempts)
+    )
+    failed_jobs = list(exhausted.all())
+    await session.execute(
+        update(QueuedRun)
+        .where(*stale, QueuedRun.attempts >= max_attempts)
+        .values(status="FAILED", finished_at=datetime.utcnow(), error="worker lost")
+    )
+    if failed_jobs:
+        await session.execute(
+            update(Job)
+            .where(Job.id.in_(failed_jobs))
+            .values(status="FAIL", summary="Worker lost", finished_at=datetime.utcnow())
+        )
+    requeued_jobs = list((await session.exec(select(QueuedRun.job_id).where(*stale))).all())
+    requeued = await session.execute(
+        update(QueuedRun).where(*stale).values(status="QUEUED", worker_id=None, heartbeat_at=None)
+    )
+    if requeued_jobs:
+        # The claim marked these RUNNING; show them as waiting again until re-claimed.
+        await session.execute(
+            update(Job)
+            .where(Job.id.in_(requeued_jobs), Job.status == "RUNNING")
+            .values(status="QUEUED")
+        )
+    await session.commit()
+    if requeued.rowcount or failed_jobs:
+        logger.warning("Re-queued %s stale runs, failed %s", requeued.rowcount, len(failed_jobs))
+    return requeued.rowcount
+
+
+async def queue_stats(session: AsyncSession) -> dict[str, Any]:
+    """Depth per status, age of the oldest queued run, claim latency and live workers."""
+
+    settings = get_settings()
+    now = datetime.utcnow()
+    counts = dict.fromkeys(QUEUE_STATUSES, 0)
+    rows = await session.exec(select(QueuedRun.status, func.count()).group_by(QueuedRun.status))
+    counts.update({status: count for status, count in rows.all()})
+    oldest = (
+        await session.exec(
+            select(func.min(QueuedRun.enqueued_at)).where(QueuedRun.status == "QUEUED")
+        )
+    ).one()
+    claims = (
+        await session.exec(
+            select(QueuedRun.enqueued_at, QueuedRun.claimed_at)
+            .where(QueuedRun.claimed_at.is_not(None))
+            .order_by(QueuedRun.claimed_at.desc())
+            .limit(_LATENCY_SAMPLE)
+        )
+    ).all()
+    latencies = sorted(
+        (claimed_at - enqueued_at).total_seconds() for enqueued_at, claimed_at in claims
+    )
+    workers = (
+        await session.exec(
+            select(func.count(func.distinct(QueuedRun.worker_id))).where(
+                QueuedRun.status == "CLAIMED",
+                QueuedRun.heartbeat_at >= now - timedelta(seconds=settings.queue_stale_after),
+            )
+        )
+    ).one()
+    return {
+        "depth": counts["QUEUED"],
+        "counts": counts,
+        "oldest_queued_s": round((now - oldest).total_seconds(), 3) if oldest else None,
+        "claim_latency_s": {
+            "samples": len(latencies),
+            "p50": _percentile(latencies, 0.5),
+            "p95": _percentile(latencies, 0.95),
+            "max": _percentile(latencies, 1.0),
+        },
+        "active_workers": workers,
+    }
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    if not ordered:
+        return None
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 3)
+
+
+class QueueWorker:
+    """Claims queued runs one at a time and executes them with a heartbeat."""
+
+    def __init__(self, worker_id: str | None = None) -> None:
+        self.worker_id = worker_id or default_worker_id()
+        self.stop_event = asyncio.Event()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    async def run(self) -> None:
+        settings = get_settings()
+        logger.info("Queue worker %s started", self.worker_id)
+        while not self.stop_event.is_set():
+            if not await self.run_once():
+                try:
+                    await asyncio.wait_for(
+                        self.stop_event.wait(), timeout=settings.queue_poll_interval
+                    )
+                except TimeoutError:
+                    pass
+        logger.info("Queue worker %s stopped", self.worker_id)
+
+    async def run_once(self) -> bool:
+        """Claim and execute one run; False when nothing was queued."""
+
+        settings = get_settings()
+        async with async_session_scope() as session:
+            await requeue_stale(session, settings.queue_stale_after, settings.queue_max_attempts)
+            queued = await claim_next(session, self.worker_id)
+            if queued is None:
+                return False
+            job = await session.get(Job, queued.job_id)
+            if job is not None:
+                job.status = "RUNNING"
+                job.stats = {
+                    **(job.stats or {}),
+                    "queue": {
+                        "worker": self.worker_id,
+                        "attempt": queued.attempts,
+                        "wait_s": round(
+                            (queued.claimed_at - queued.enqueued_at).total_seconds(), 3
+                        ),
+                    },
+                }
+                session.add(job)
+                await session.commit()
+        logger.info(
+            "Worker %s claimed job %s (attempt %s)", self.worker_id, queued.job_id, queued.attempts
+        )
+
+        async def still_claimed(session: AsyncSession) -> None:
+            # Same transaction as the job's SUCCESS commit, so a run re-queued meanwhile
+            # never has its results written twice.
+            if not await heartbeat(session, queued.id, self.worker_id, commit=False):
+                raise PipelineAborted(f"claim on run {queued.id} lost")
+
+        pipeline = asyncio.create_task(
+            run_pipeline(
+                single_ticker=queued.ticker, job_id=queued.job_id, commit_guard=still_claimed
+            )
+        )
+        beat = asyncio.create_task(self._heartbeat(queued.id))
+        await asyncio.wait({pipeline, beat}, return_when=asyncio.FIRST_COMPLETED)
+        beat.cancel()
+        await asyncio.gather(beat, return_exceptions=True)
+        if not pipeline.done():
+            # The heartbeat only returns once the claim is gone; another worker owns the job now.
+            pipeline.cancel()
+            await asyncio.gather(pipeline, return_exceptions=True)
+        try:
+            await pipeline
+        except (PipelineAborted, asyncio.CancelledError):
+            logger.warning(
+                "Worker %s abandoned job %s after losing its claim", self.worker_id, queued.job_id
+            )
+            return True
+        except Exception as exc:  # noqa: BLE001
+            # run_pipeline has already marked the job FAIL and logged the traceback.
+            error: str | None = str(exc) or type(exc).__name__
+        else:
+            error = None
+        async with async_session_scope() as session:
+            await finish_run(session, queued.id, self.worker_id, error)
+        return True
+
+    async def _heartbeat(self, run_id: int) -> None:
+        interval = get_settings().queue_heartbeat_interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session_scope() as session:
+                    if not await heartbeat(session, run_id, self.worker_id):
+                        logger.warning("Worker %s lost its claim on run %s", self.worker_id, run_id)
+                        return
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Heartbeat for run %s failed: %s", run_id, exc)
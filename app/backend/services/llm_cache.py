@@ -0,0 +1,77 @@
+"""Content-addressed cache of per-ticker LLM decisions."""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from ..core.config import get_settings
+from ..models.llm_cache import LlmCache
+from .result_cache import load_entries, store_entries
+
+
+def decision_key(model: str, prompts: list[str], ticker_inputs: dict[str, Any]) -> str:
+    """Hash canonicalised per-ticker inputs together with the prompt texts and model name."""
+
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    for prompt in prompts:
+        digest.update(b"\0")
+        digest.update(prompt.encode())
+    digest.update(b"\0")
+    payload = json.dumps(ticker_inputs, sort_keys=True, separators=(",", ":"), default=str)
+    digest.update(payload.encode())
+    return digest.hexdigest()
+
+
+def discoveries_key(keys: dict[str, str]) -> str:
+    """Key for the discoveries of a whole watchlist, from its per-ticker decision keys."""
+
+    return hashlib.sha256("\0".join(sorted(keys.values())).encode()).hexdigest()
+
+
+def load_decisions(keys: dict[str, str]) -> dict[str, dict[str, Any]]:
+    """Return cached decisions by ticker for the given {ticker: key} mapping."""
+
+    return load_entries(LlmCache, keys, "decision", get_settings().llm_cache_ttl)
+
+
+def store_decisions(model: str, keys: dict[str, str], decisions: dict[str, dict[str, Any]]) -> None:
+    """Persist decisions, then evict expired rows and the oldest rows above the size budget."""
+
+    settings = get_settings()
+    entries = []
+    for ticker, decision in decisions.items():
+        if ticker not in keys:
+            continue
+        payload = json.dumps(decision)
+        entries.append(
+            LlmCache(
+                key=keys[ticker], ticker=ticker, model=model, decision=payload, size=len(payload)
+            )
+        )
+    store_entries(
+        LlmCache, entries, settings.llm_cache_ttl, settings.llm_cache_max_bytes, size="size"
+    )
+
+
+def load_discoveries(keys: dict[str, str]) -> list[Any] | None:
+    """Return the discoveries last generated for exactly this watchlist, if still cached."""
+
+    found = load_entries(
+        LlmCache, {"*": discoveries_key(keys)}, "decision", get_settings().llm_cache_ttl
+    )
+    return found.get("*")
+
+
+def store_discoveries(model: str, keys: dict[str, str], discoveries: list[Any]) -> None:
+    """Persist the discoveries of a whole watchlist, in the same table and budget as decisions."""
+
+    settings = get_settings()
+    payload = json.dumps(discoveries)
+    entry = LlmCache(
+        key=discoveries_key(keys), ticker="*", model=model, decision=payload, size=len(payload)
+    )
+    store_entries(
+        LlmCache, [entry], settings.llm_cache_ttl, settings.llm_cache_max_bytes, size="size"
+    )
@@ -0,0 +1,327 @@
+"""Market data access backed by a local on-disk bar store."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+from uuid import uuid4
+
+import pandas as pd
+import yfinance as yf
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+class Downloader(Protocol):
+    """Callable fetching bars for a symbol, optionally starting at a timestamp."""
+
+    def __call__(
+        self, symbol: str, *, start: pd.Timestamp | None, lookback_days: int, interval: str
+    ) -> pd.DataFrame:
+        """Return raw OHLCV bars indexed by timestamp."""
+
+
+def yfinance_downloader(
+    symbol: str, *, start: pd.Timestamp | None, lookback_days: int, interval: str
+) -> pd.DataFrame:
+    """Download bars from yfinance, either a full lookback or from `start` onwards."""
+
+    if start is None:
+        return yf.download(symbol, period=f"{lookback_days}d", interval=interval, progress=False)
+    return yf.download(symbol, start=start.to_pydatetime(), interval=interval, progress=False)
+
+
+class BatchDownloader(Protocol):
+    """Callable fetching bars for several symbols in one request."""
+
+    def __call__(
+        self, symbols: list[str], *, start: pd.Timestamp | None, lookback_days: int, interval: str
+    ) -> pd.DataFrame:
+        """Return a frame with (symbol, field) MultiIndex columns."""
+
+
+def yfinance_batch_downloader(
+    symbols: list[str], *, start: pd.Timestamp | None, lookback_days: int, interval: str
+) -> pd.DataFrame:
+    """Download several symbols from yfinance in a single multi-ticker request."""
+
+    if start is None:
+        return yf.download(
+            symbols,
+            period=f"{lookback_days}d",
+            interval=interval,
+            group_by="ticker",
+            progress=False,
+        )
+    return yf.download(
+        symbols, start=start.to_pydatetime(), interval=interval, group_by="ticker", progress=False
+    )
+
+
+@dataclass
+class BatchLoadResult:
+    frames: dict[str, pd.DataFrame] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+
+    def merge(self, other: BatchLoadResult) -> None:
+        self.frames.update(other.frames)
+        self.errors.update(other.errors)
+
+
+def split_batch_frame(raw: pd.DataFrame, symbols: list[str]) -> dict[str, pd.DataFrame]:
+    """Split a multi-ticker download into per-symbol frames, dropping empty ones."""
+
+    if raw is None or raw.empty:
+        return {}
+    if not isinstance(raw.columns, pd.MultiIndex):
+        return {symbols[0]: raw} if len(symbols) == 1 else {}
+    level = 0 if set(symbols) & set(raw.columns.get_level_values(0)) else 1
+    available = set(raw.columns.get_level_values(level))
+    frames: dict[str, pd.DataFrame] = {}
+    for symbol in symbols:
+        if symbol not in available:
+            continue
+        part = raw.xs(symbol, axis=1, level=level).dropna(how="all")
+        if not part.empty:
+            frames[symbol] = part
+    return frames
+
+
+def normalise_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-case columns, coerce the index to datetimes and keep OHLCV only."""
+
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel(-1, axis=1)
+    df = df.rename(columns=lambda column: str(column).lower())
+    df.index = pd.to_datetime(df.index)
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    columns = [column for column in OHLCV_COLUMNS if column in df.columns]
+    return df[columns].dropna(how="all").sort_index()
+
+
+class BarStore:
+    """Per-symbol Parquet files keyed by symbol and interval."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, symbol: str, interval: str) -> Path:
+        safe_symbol = symbol.replace("/", "-").replace("\\", "-")
+        return self.root / f"{safe_symbol}_{interval}.parquet"
+
+    def load(self, symbol: str, interval: str) -> pd.DataFrame | None:
+        path = self.path_for(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Discarding unreadable bar file %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def age_seconds(self, symbol: str, interval: str) -> float | None:
+        path = self.path_for(symbol, interval)
+        if not path.exists():
+            return None
+        return time.time() - path.stat().st_mtime
+
+    def append(self, symbol: str, interval: str, bars: pd.DataFrame) -> pd.DataFrame:
+        """Merge new bars into the stored series; newer rows win on equal timestamps."""
+
+        existing = self.load(symbol, interval)
+        merged = bars if existing is None else pd.concat([existing, bars])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        _write_atomic(self.path_for(symbol, interval), merged.to_parquet)
+        return merged
+
+    def load_state(self, symbol: str, interval: str, name: str) -> dict[str, Any] | None:
+        """Return derived state persisted next to the bars (e.g. indicator accumulators)."""
+
+        path = self._state_path(symbol, interval, name)
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            logger.warning("Discarding unreadable state file %s: %s", path, exc)
+            return None
+
+    def save_state(self, symbol: str, interval: str, name: str, state: dict[str, Any]) -> None:
+        text = json.dumps(state)
+        _write_atomic(
+            self._state_path(symbol, interval, name),
+            lambda tmp_path: tmp_path.write_text(text, encoding="utf-8"),
+        )
+
+    def _state_path(self, symbol: str, interval: str, name: str) -> Path:
+        return self.path_for(symbol, interval).with_suffix(f".{name}.json")
+
+
+def _write_atomic(path: Path, write: Callable[[Path], Any]) -> None:
+    """Write through a temp file unique to this call, then move it over `path`.
+
+    Workers appending the same symbol concurrently each replace the file whole, so
+    readers never see a partial write and no writer moves another's temp file away.
+    """
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{uuid4().hex}.tmp")
+    try:
+        write(tmp_path)
+        tmp_path.replace(path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+_bar_store: BarStore | None = None
+
+
+def get_bar_store() -> BarStore:
+    """Return the process-wide bar store."""
+
+    global _bar_store
+    root = Path(get_settings().bar_store_dir)
+    if _bar_store is None or _bar_store.root != root:
+        _bar_store = BarStore(root)
+    return _bar_store
+
+
+def load_bars(
+    symbol: str,
+    lookback_days: int = 120,
+    interval: str = "1d",
+    store: BarStore | None = None,
+    downloader: Downloader | None = None,
+) -> pd.DataFrame:
+    """Return bars from the store, topping up only what is missing since the last stored bar."""
+
+    store = store or get_bar_store()
+    downloader = downloader or yfinance_downloader
+    stored = store.load(symbol, interval)
+    if _is_fresh(store, symbol, interval, stored):
+        return _trim(stored, lookback_days)
+
+    # Re-request the last stored bar as well: it may have been a partial session.
+    start = stored.index[-1] if stored is not None and not stored.empty else None
+    try:
+        fresh = downloader(symbol, start=start, lookback_days=lookback_days, interval=interval)
+    except Exception as exc:  # noqa: BLE001
+        if stored is None or stored.empty:
+            raise
+        logger.warning("Top-up failed for %s, serving stored bars: %s", symbol, exc)
+        fresh = None
+    if fresh is not None and not fresh.empty:
+        stored = store.append(symbol, interval, normalise_ohlcv(fresh))
+    if stored is None or stored.empty:
+        raise ValueError("No OHLCV data fetched")
+    return _trim(stored, lookback_days)
+
+
+def iter_bar_batches(
+    symbols: list[str],
+    lookback_days: int = 120,
+    interval: str = "1d",
+    chunk_size: int | None = None,
+    store: BarStore | None = None,
+    downloader: BatchDownloader | None = None,
+) -> Iterator[BatchLoadResult]:
+    """Load bars chunk by chunk, issuing one multi-symbol request per chunk of stale symbols."""
+
+    store = store or get_bar_store()
+    downloader = downloader or yfinance_batch_downloader
+    chunk_size = max(1, chunk_size or get_settings().ohlcv_batch_size)
+    for offset in range(0, len(symbols), chunk_size):
+        chunk = symbols[offset : offset + chunk_size]
+        yield _load_chunk(chunk, lookback_days, interval, store, downloader)
+
+
+def load_bars_batch(
+    symbols: list[str],
+    lookback_days: int = 120,
+    interval: str = "1d",
+    chunk_size: int | None = None,
+    store: BarStore | None = None,
+    downloader: BatchDownloader | None = None,
+) -> BatchLoadResult:
+    """Load bars for every symbol, reporting failures per symbol instead of raising."""
+
+    result = BatchLoadResult()
+    for chunk in iter_bar_batches(symbols, lookback_days, interval, chunk_size, store, downloader):
+        result.merge(chunk)
+    return result
+
+
+def _load_chunk(
+    symbols: list[str],
+    lookback_days: int,
+    interval: str,
+    store: BarStore,
+    downloader: BatchDownloader,
+) -> BatchLoadResult:
+    result = BatchLoadResult()
+    stored: dict[str, pd.DataFrame | None] = {}
+    for symbol in symbols:
+        frame = store.load(symbol, interval)
+        if _is_fresh(store, symbol, interval, frame):
+            result.frames[symbol] = _trim(frame, lookback_days)
+        else:
+            stored[symbol] = frame
+    if not stored:
+        return result
+
+    # One request per chunk: start from the oldest last-stored bar, or a full lookback
+    # as soon as one symbol has nothing stored yet. Overlapping bars are deduplicated on append.
+    last_stored = [
+        frame.index[-1] for frame in stored.values() if frame is not None and not frame.empty
+    ]
+    start = min(last_stored) if len(last_stored) == len(stored) else None
+    stale = list(stored)
+    try:
+        fresh = split_batch_frame(
+            downloader(stale, start=start, lookback_days=lookback_days, interval=interval), stale
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.error("Batch download failed for %s: %s", ", ".join(stale), exc)
+        fresh = {}
+        failure = str(exc)
+    else:
+        failure = "No OHLCV data fetched"
+
+    for symbol, frame in stored.items():
+        try:
+            if symbol in fresh:
+                frame = store.append(symbol, interval, normalise_ohlcv(fresh[symbol]))
+            elif frame is not None and not frame.empty:
+                logger.warning("No new bars for %s, serving stored bars", symbol)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Failed to store bars for %s: %s", symbol, exc)
+            result.errors[symbol] = str(exc)
+            continue
+        if frame is None or frame.empty:
+            result.errors[symbol] = failure
+        else:
+            result.frames[symbol] = _trim(frame, lookback_days)
+    return result
+
+
+def _is_fresh(store: BarStore, symbol: str, interval: str, stored: pd.DataFrame | None) -> bool:
+    if stored is None or stored.empty:
+        return False
+    age = store.age_seconds(symbol, interval)
+    return age is not None and age < get_settings().bar_store_max_age
+
+
+def _trim(df: pd.DataFrame, lookback_days: int) -> pd.DataFrame:
+    cutoff = df.index[-1] - pd.Timedelta(days=lookback_days)
+    return df[df.index > cutoff]
@@ -0,0 +1,163 @@
+"""Vectorised indicator engine over a (time x symbol) panel."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+FEATURE_COLUMNS = (
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "rsi",
+    "atr",
+    "atr_pct",
+    "gap_pct",
+    "vol_rel",
+    "spread_pct",
+    "sma_20",
+    "sma_50",
+)
+
+
+@dataclass
+class Panel:
+    """Price arrays of shape (time, symbol), right-aligned on each symbol's latest bar.
+
+    Symbols trade on different calendars (crypto vs equities), so rows are bar offsets
+    from the latest bar rather than shared timestamps; shorter histories are NaN-padded
+    at the top.
+    """
+
+    symbols: list[str]
+    last_timestamps: list[pd.Timestamp]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+@dataclass
+class PanelFeatures:
+    """Latest feature values, one row per symbol and one column per FEATURE_COLUMNS entry."""
+
+    symbols: list[str]
+    values: np.ndarray
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, FEATURE_COLUMNS.index(name)]
+
+    def as_dicts(self) -> dict[str, dict[str, Any]]:
+        """Return per-symbol dicts shaped like `features.compute_indicators` output."""
+
+        result: dict[str, dict[str, Any]] = {}
+        for row, symbol in enumerate(self.symbols):
+            latest: dict[str, Any] = {
+                name: float(value)
+                for name, value in zip(FEATURE_COLUMNS, self.values[row], strict=True)
+            }
+            latest["levels"] = {"sma_20": latest.pop("sma_20"), "sma_50": latest.pop("sma_50")}
+            result[symbol] = latest
+        return result
+
+
+def build_panel(frames: dict[str, pd.DataFrame], length: int | None = None) -> Panel:
+    """Stack per-symbol OHLCV frames into right-aligned float arrays."""
+
+    symbols = [symbol for symbol, frame in frames.items() if not frame.empty]
+    rows = length or max((len(frames[symbol]) for symbol in symbols), default=0)
+    arrays = {name: np.full((rows, len(symbols)), np.nan) for name in PRICE_FIELDS}
+    last_timestamps: list[pd.Timestamp] = []
+    for col, symbol in enumerate(symbols):
+        frame = frames[symbol].tail(rows)
+        for name in PRICE_FIELDS:
+            if name in frame.columns:
+                arrays[name][rows - len(frame) :, col] = frame[name].to_numpy(dtype=float)
+        last_timestamps.append(pd.Timestamp(frame.index[-1]))
+    return Panel(symbols=symbols, last_timestamps=last_timestamps, **arrays)
+
+
+def wilder_mean(values: np.ndarray, length: int) -> np.ndarray:
+    """Wilder moving average along axis 0, like pandas `ewm(alpha=1/length, min_periods=length)`.
+
+    Uses the adjusted EWM recursion (weighted sum over weight total) so NaN rows decay
+    the weights without contributing, exactly like pandas with `ignore_na=False`.
+    """
+
+    decay = 1.0 - 1.0 / length
+    observed = ~np.isnan(values)
+    filled = np.where(observed, values, 0.0)
+    weighted = np.zeros(values.shape[1:])
+    total = np.zeros(values.shape[1:])
+    count = np.zeros(values.shape[1:])
+    out = np.full(values.shape, np.nan)
+    for row in range(values.shape[0]):
+        weighted = weighted * decay + filled[row]
+        total = total * decay + observed[row]
+        count += observed[row]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out[row] = np.where(count >= length, weighted / total, np.nan)
+    return out
+
+
+def rsi(close: np.ndarray, length: int = 14) -> np.ndarray:
+    delta = np.diff(close, axis=0, prepend=np.nan)
+    flat = np.where(np.isnan(delta), np.nan, 0.0)
+    gains = wilder_mean(np.where(delta > 0, delta, flat), length)
+    losses = wilder_mean(np.where(delta < 0, -delta, flat), length)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return 100.0 * gains / (gains + losses)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int = 14) -> np.ndarray:
+    prev_close = np.roll(close, 1, axis=0)
+    prev_close[0] = np.nan
+    true_range = np.fmax(
+        high - low, np.fmax(np.abs(high - prev_close), np.abs(prev_close - low))
+    )
+    true_range[np.isnan(prev_close)] = np.nan
+    return wilder_mean(true_range, length)
+
+
+def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last `window` rows per column; NaN when the window is incomplete."""
+
+    if values.shape[0] < window:
+        return np.full(values.shape[1:], np.nan)
+    return values[-window:].mean(axis=0)
+
+
+def compute_panel_features(panel: Panel) -> PanelFeatures:
+    """Compute the latest RSI, ATR, gap, volume and spread features for every symbol at once."""
+
+    close = panel.close
+    if close.shape[0] == 0:
+        empty = np.empty((len(panel.symbols), len(FEATURE_COLUMNS)))
+        return PanelFeatures(symbols=panel.symbols, values=empty)
+    last_close = close[-1]
+    prev_close = close[-2] if close.shape[0] > 1 else np.full_like(last_close, np.nan)
+    last_atr = atr(panel.high, panel.low, close)[-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        columns = {
+            "open": panel.open[-1],
+            "high": panel.high[-1],
+            "low": panel.low[-1],
+            "close": last_close,
+            "volume": panel.volume[-1],
+            "rsi": rsi(close)[-1],
+            "atr": last_atr,
+            "atr_pct": last_atr / last_close,
+            "gap_pct": last_close / prev_close - 1.0,
+            "vol_rel": panel.volume[-1] / trailing_mean(panel.volume, 20),
+            "spread_pct": (panel.high[-1] - panel.low[-1]) / last_close,
+            "sma_20": trailing_mean(close, 20),
+            "sma_50": trailing_mean(close, 50),
+        }
+    values = np.column_stack([columns[name] for name in FEATURE_COLUMNS])
+    return PanelFeatures(symbols=panel.symbols, values=values)
@@ -0,0 +1,56 @@
+"""Bulk persistence of per-ticker job results."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.job_result import JobResult
+
+
+def result_row(
+    job_id: int,
+    ticker: str,
+    gatekeeper_status: str,
+    backtest: dict[str, Any],
+    decision: dict[str, Any],
+    chart_path: str | None,
+) -> dict[str, Any]:
+    """Return a `jobresult` row as a plain dict ready for a Core insert."""
+
+    return {
+        "job_id": job_id,
+        "ticker": ticker,
+        "decision": (
+            "TRADE_OK"
+            if gatekeeper_status == "PASS" and decision.get("playbook") != "NO_TRADE"
+            else "NO_TRADE"
+        ),
+        "metrics": backtest,
+        "chart_path": chart_path,
+        "sources": decision.get("sources"),
+        "raw_llm": decision,
+        "created_at": datetime.utcnow(),
+    }
+
+
+async def write_job_results(
+    session: AsyncSession, rows: Iterable[dict[str, Any]], batch_size: int = 500
+) -> int:
+    """Insert `rows` in executemany batches inside the session's transaction.
+
+    `rows` is consumed lazily, so a generator keeps at most one batch in memory. The
+    caller commits, which lets the results and the job's final status land together.
+    """
+
+    statement = insert(JobResult.__table__)
+    rows = iter(rows)
+    written = 0
+    while batch := list(islice(rows, batch_size)):
+        await session.execute(statement, batch)
+        written += len(batch)
+    return written
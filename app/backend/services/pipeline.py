@@ -4,142 +4,366 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any
+from pathlib import Path
+from typing import Any, TypeVar
 
 from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.database import session_scope
+from ..core.config import get_settings
+from ..core.database import async_session_scope
 from ..models.job import Job
-from ..models.job_result import JobResult
 from ..models.ticker import Ticker
-from ..models.setting import Setting
-from .backtest import quick_backtest
-from .features import build_feature_bundle
-from .gatekeeper import apply_gatekeeper
-from .research import fetch_news_for_watchlist
+from .backtest import QUICK_BACKTEST_SPEC
+from .backtest_cache import backtest_key, load_backtests, store_backtests
+from .charts import CHARTS_DIR, chart_key, prerender_charts
+from .gatekeeper import evaluate_watchlist
+from .incremental import update_indicator_state
+from .market_data import iter_bar_batches
+from .panel import build_panel, compute_panel_features
+from .persistence import result_row, write_job_results
 from .report import send_report
-from .strategy import generate_strategy
+from .research import fetch_news_for_watchlist
+from .robustness import RobustnessSpec
+from .settings_provider import current_settings, get_settings_snapshot, use_settings
+from .strategy import generate_strategy, settings_as_payload
+from .workers import TickerAnalysis, analyse_ticker, get_process_pool
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class PipelineAborted(Exception):
+    """Raised by a commit guard to abandon a run without touching its job, e.g. when
+    the run's queue claim has passed to another worker."""
+
+
+class StageTimer:
+    """Collects wall-clock span and busy time per pipeline stage.
+
+    Stages overlap and run once per chunk or ticker, so each records the span from its
+    first start to its last end (`wall_s`) and the summed duration of its runs (`busy_s`).
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.spans: dict[str, dict[str, float]] = {}
+
+    @contextmanager
+    def track(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            ended = time.perf_counter()
+            span = self.spans.setdefault(
+                stage, {"start": started, "end": ended, "busy": 0.0, "runs": 0}
+            )
+            span["start"] = min(span["start"], started)
+            span["end"] = max(span["end"], ended)
+            span["busy"] += ended - started
+            span["runs"] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        stages = {
+            stage: {
+                "offset_s": round(span["start"] - self.origin, 3),
+                "wall_s": round(span["end"] - span["start"], 3),
+                "busy_s": round(span["busy"], 3),
+                "runs": int(span["runs"]),
+            }
+            for stage, span in self.spans.items()
+        }
+        return {"total_s": round(time.perf_counter() - self.origin, 3), "stages": stages}
+
+
+async def _timed(timer: StageTimer, stage: str, awaitable: Awaitable[T]) -> T:
+    with timer.track(stage):
+        return await awaitable
+
+
+async def _analyse_watchlist(
+    symbols: list[str], timer: StageTimer, stats: dict[str, Any] | None = None
+) -> tuple[dict[str, Any], dict[str, str | None], dict[str, Any]]:
+    """Load bars chunk by chunk and fan out features and backtests as each chunk lands.
 
-async def run_pipeline(single_ticker: str | None = None, job_id: int | None = None) -> Job:
-    """Execute orchestrated pipeline for active tickers."""
+    Feature passes and pool backtests for a chunk run while the next chunk downloads.
+    Backtests whose bars match a cached fingerprint are not recomputed; the symbols
+    served from cache are listed in `stats["backtest_cache"]`.
+    """
+
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    batches = iter_bar_batches(symbols)
+    frames: dict[str, Any] = {}
+    feature_tasks: list[asyncio.Task] = []
+    backtest_tasks: list[asyncio.Future] = []
+    cache_keys: dict[str, str] = {}
+    cache_hits: list[str] = []
+    robustness = robustness_spec(current_settings())
+    while True:
+        with timer.track("ohlcv"):
+            chunk = await asyncio.to_thread(next, batches, None)
+        if chunk is None:
+            break
+        for symbol, error in chunk.errors.items():
+            logger.error("Failed to download OHLCV for %s: %s", symbol, error)
+        frames.update(chunk.frames)
+        feature_tasks.append(
+            asyncio.create_task(
+                _timed(
+                    timer,
+                    "features",
+                    asyncio.to_thread(compute_watchlist_features, chunk.frames),
+                )
+            )
+        )
+        keys, cached = await asyncio.to_thread(_cached_backtests, chunk.frames, robustness)
+        cache_keys.update(keys)
+        for symbol, frame in chunk.frames.items():
+            if symbol in cached:
+                cache_hits.append(symbol)
+                hit = loop.create_future()
+                hit.set_result(TickerAnalysis(symbol=symbol, backtest=cached[symbol]))
+                backtest_tasks.append(hit)
+                continue
+            backtest_tasks.append(
+                asyncio.ensure_future(
+                    _timed(
+                        timer,
+                        "backtest",
+                        loop.run_in_executor(pool, analyse_ticker, symbol, frame, robustness),
+                    )
+                )
+            )
+
+    features: dict[str, Any] = {}
+    for chunk_features in await asyncio.gather(*feature_tasks):
+        features.update(chunk_features)
+    charts: dict[str, str | None] = {}
+    backtests: dict[str, Any] = {}
+    for completed in asyncio.as_completed(backtest_tasks):
+        analysis = await completed
+        if analysis.symbol not in features:
+            # Its feature pass failed and was logged; skip the ticker as a whole.
+            continue
+        if analysis.error:
+            logger.error("Backtest failed for %s: %s", analysis.symbol, analysis.error)
+            features.pop(analysis.symbol, None)
+            continue
+        # Charts are rendered lazily on first request; store only their cache key.
+        last_bar = frames[analysis.symbol].index[-1]
+        charts[analysis.symbol] = str(CHARTS_DIR / chart_key(analysis.symbol, last_bar))
+        backtests[analysis.symbol] = analysis.backtest
+    fresh = {symbol: metrics for symbol, metrics in backtests.items() if symbol not in cache_hits}
+    await asyncio.to_thread(store_backtests, cache_keys, fresh)
+    if stats is not None:
+        stats["backtest_cache"] = {
+            "hits": sorted(cache_hits),
+            "misses": len(cache_keys) - len(cache_hits),
+        }
+    if get_settings().chart_prerender:
+        keys = [Path(path).name for path in charts.values() if path]
+        with timer.track("charts"):
+            await loop.run_in_executor(None, prerender_charts, keys, pool)
+    return features, charts, backtests
+
+
+def robustness_spec(settings: Any) -> RobustnessSpec | None:
+    """Robustness configuration for this run, or None when the stage is disabled."""
+
+    if not settings.robustness_enabled:
+        return None
+    return RobustnessSpec(
+        samples=settings.bootstrap_samples,
+        block=settings.bootstrap_block,
+        confidence=settings.bootstrap_confidence,
+        folds=settings.walk_forward_folds,
+    )
+
+
+def _cached_backtests(
+    frames: dict[str, Any], robustness: RobustnessSpec | None
+) -> tuple[dict[str, str], dict[str, dict[str, Any]]]:
+    spec = {**QUICK_BACKTEST_SPEC, "robustness": robustness.as_dict() if robustness else None}
+    keys = {symbol: backtest_key(symbol, frame, spec) for symbol, frame in frames.items()}
+    return keys, load_backtests(keys)
+
+
+def compute_watchlist_features(frames: dict[str, Any]) -> dict[str, Any]:
+    """Latest features per symbol, from persisted incremental state or one panel pass.
+
+    A symbol whose features fail is logged and left out; when the chunk's panel pass
+    fails it is retried symbol by symbol so the others still get features.
+    """
+
+    if get_settings().incremental_indicators:
+        return _features_per_symbol(frames, update_indicator_state)
+    try:
+        return compute_panel_features(build_panel(frames)).as_dicts()
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Panel feature pass failed, retrying per symbol: %s", exc)
+        return _features_per_symbol(frames, _panel_features)
+
+
+def _panel_features(symbol: str, frame: Any) -> dict[str, Any]:
+    return compute_panel_features(build_panel({symbol: frame})).as_dicts()[symbol]
+
+
+def _features_per_symbol(
+    frames: dict[str, Any], compute: Callable[[str, Any], dict[str, Any]]
+) -> dict[str, Any]:
+    features: dict[str, Any] = {}
+    for symbol, frame in frames.items():
+        try:
+            features[symbol] = compute(symbol, frame)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Feature generation failed for %s: %s", symbol, exc)
+    return features
+
+
+async def run_pipeline(
+    single_ticker: str | None = None,
+    job_id: int | None = None,
+    commit_guard: Callable[[AsyncSession], Awaitable[None]] | None = None,
+) -> Job:
+    """Execute orchestrated pipeline for active tickers.
+
+    `commit_guard` runs inside the transaction that writes the results, or marks the
+    job FAIL, just before it commits; raising PipelineAborted there rolls the write
+    back and leaves the job as it is.
+    """
 
     logger.info("Starting pipeline for %s", single_ticker or "watchlist")
-    with session_scope() as session:
+    timer = StageTimer()
+    run_stats: dict[str, Any] = {}
+    async with async_session_scope() as session:
         if job_id is not None:
-            job = session.get(Job, job_id)
+            job = await session.get(Job, job_id)
         else:
             job = Job()
             session.add(job)
-            session.commit()
-            session.refresh(job)
+            await session.commit()
+            await session.refresh(job)
         if job is None:
             raise ValueError("Job not found")
 
-    try:
-        with session_scope() as session:
-            tickers_query = select(Ticker).where(Ticker.active == True)  # noqa: E712
-            if single_ticker:
-                tickers_query = tickers_query.where(Ticker.symbol == single_ticker)
-            tickers = session.exec(tickers_query).all()
-            settings = session.get(Setting, 1)
-            if not settings:
-                settings = Setting()
-                session.add(settings)
-                session.commit()
-        watchlist_payload = [
-            {"symbol": ticker.symbol, "market": ticker.market}
-            for ticker in tickers
-        ]
-        research = await fetch_news_for_watchlist([ticker.symbol for ticker in tickers])
-        features: dict[str, Any] = {}
-        charts: dict[str, str | None] = {}
-        dataframes: dict[str, Any] = {}
-        for ticker in tickers:
+    snapshot = await asyncio.to_thread(get_settings_snapshot)
+    run_stats["thresholds"] = settings_as_payload(snapshot)
+    with use_settings(snapshot):
+        try:
+            async with async_session_scope() as session:
+                tickers_query = select(Ticker).where(Ticker.active == True)  # noqa: E712
+                if single_ticker:
+                    tickers_query = tickers_query.where(Ticker.symbol == single_ticker)
+                tickers = (await session.exec(tickers_query)).all()
+            watchlist_payload = [
+                {"symbol": ticker.symbol, "market": ticker.market}
+                for ticker in tickers
+            ]
+            symbols = [ticker.symbol for ticker in tickers]
+            research_task = asyncio.create_task(
+                _timed(timer, "research", fetch_news_for_watchlist(symbols))
+            )
+            features, charts, backtests = await _analyse_watchlist(symbols, timer, run_stats)
+            research = await research_task
             try:
-                bundle = build_feature_bundle(ticker.symbol)
+                with timer.track("strategy"):
+                    llm_payload = await generate_strategy(
+                        watchlist_payload, research, features, backtests, stats=run_stats
+                    )
             except Exception as exc:  # noqa: BLE001
-                logger.error("Feature generation failed for %s: %s", ticker.symbol, exc)
-                continue
-            features[ticker.symbol] = bundle.features
-            charts[ticker.symbol] = bundle.chart_path
-            dataframes[ticker.symbol] = bundle.dataframe
-        backtests: dict[str, Any] = {}
-        for symbol, df in dataframes.items():
-            result = quick_backtest(df)
-            backtests[symbol] = result.metrics
-        try:
-            llm_payload = await generate_strategy(watchlist_payload, research, features, backtests)
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Strategy generation failed: %s", exc)
-            llm_payload = {
-                "asof_utc": datetime.utcnow().isoformat(),
-                "decisions": [
-                    {
-                        "ticker": symbol,
-                        "playbook": "NO_TRADE",
-                        "gatekeeper": {"precheck": "BLOCK", "reasons": ["llm_failed"]},
-                    }
-                    for symbol in features.keys()
-                ],
-                "discoveries": [],
-                "notes": "LLM unavailable",
+                logger.error("Strategy generation failed: %s", exc)
+                llm_payload = {
+                    "asof_utc": datetime.utcnow().isoformat(),
+                    "decisions": [
+                        {
+                            "ticker": symbol,
+                            "playbook": "NO_TRADE",
+                            "gatekeeper": {"precheck": "BLOCK", "reasons": ["llm_failed"]},
+                        }
+                        for symbol in features.keys()
+                    ],
+                    "discoveries": [],
+                    "notes": "LLM unavailable",
+                }
+            decisions = {
+                item["ticker"]: item
+                for item in llm_payload.get("decisions", [])
+                if item.get("ticker")
             }
-        decisions = {item["ticker"]: item for item in llm_payload.get("decisions", []) if item.get("ticker")}
-        with session_scope() as session:
-            job = session.get(Job, job.id)
-            assert job is not None
-            job.summary = json.dumps({"discoveries": llm_payload.get("discoveries", [])})
-            for ticker in tickers:
-                feature_data = features.get(ticker.symbol, {})
-                bt_metrics = backtests.get(ticker.symbol, {"status": "INSUFFICIENT_DATA"})
-                gatekeeper_status, reasons = apply_gatekeeper(feature_data, bt_metrics)
-                decision = decisions.get(ticker.symbol, {
-                    "ticker": ticker.symbol,
-                    "playbook": "NO_TRADE",
-                    "gatekeeper": {"precheck": gatekeeper_status, "reasons": reasons},
-                })
-                decision.setdefault("gatekeeper", {"precheck": gatekeeper_status, "reasons": reasons})
-                if decision["gatekeeper"].get("precheck") != gatekeeper_status:
-                    decision["gatekeeper"] = {"precheck": gatekeeper_status, "reasons": reasons}
-                job_result = JobResult(
-                    job_id=job.id,
-                    ticker=ticker.symbol,
-                    decision="TRADE_OK" if gatekeeper_status == "PASS" and decision.get("playbook") != "NO_TRADE" else "NO_TRADE",
-                    metrics=bt_metrics,
-                    chart_path=charts.get(ticker.symbol),
-                    sources=decision.get("sources"),
-                    raw_llm=decision,
-                )
-                session.add(job_result)
-                if charts.get(ticker.symbol):
-                    asyncio.create_task(
-                        send_report(
-                            ticker.symbol,
-                            feature_data,
-                            bt_metrics,
-                            decision,
-                            charts[ticker.symbol],
-                        )
+            reports: list[tuple[str, dict[str, Any], dict[str, Any], dict[str, Any], str]] = []
+
+            all_metrics = {
+                ticker.symbol: backtests.get(ticker.symbol, {"status": "INSUFFICIENT_DATA"})
+                for ticker in tickers
+            }
+            gates = evaluate_watchlist(features, all_metrics, snapshot).as_dict()
+
+            def result_rows() -> Iterator[dict[str, Any]]:
+                for ticker in tickers:
+                    feature_data = features.get(ticker.symbol, {})
+                    bt_metrics = all_metrics[ticker.symbol]
+                    gatekeeper_status, reasons = gates[ticker.symbol]
+                    gate = {"precheck": gatekeeper_status, "reasons": reasons}
+                    decision = decisions.get(ticker.symbol, {
+                        "ticker": ticker.symbol,
+                        "playbook": "NO_TRADE",
+                        "gatekeeper": gate,
+                    })
+                    decision.setdefault("gatekeeper", gate)
+                    if decision["gatekeeper"].get("precheck") != gatekeeper_status:
+                        decision["gatekeeper"] = gate
+                    chart = charts.get(ticker.symbol)
+                    if chart:
+                        reports.append((ticker.symbol, feature_data, bt_metrics, decision, chart))
+                    yield result_row(
+                        job.id, ticker.symbol, gatekeeper_status, bt_metrics, decision, chart
                     )
-            job.status = "SUCCESS"
-            job.finished_at = datetime.utcnow()
-            session.add(job)
-            session.commit()
-            session.refresh(job)
-        return job
-    except Exception as exc:  # noqa: BLE001
-        logger.exception("Pipeline failed: %s", exc)
-        with session_scope() as session:
-            job = session.get(Job, job.id)
-            if job:
-                job.status = "FAIL"
-                job.summary = str(exc)
+
+            async with async_session_scope() as session:
+                job = await session.get(Job, job.id)
+                assert job is not None
+                if "discoveries" in llm_payload:
+                    job.summary = json.dumps({"discoveries": llm_payload["discoveries"]})
+                with timer.track("persist"):
+                    run_stats["results_written"] = await write_job_results(
+                        session, result_rows(), get_settings().result_batch_size
+                    )
+                job.status = "SUCCESS"
                 job.finished_at = datetime.utcnow()
+                job.stats = {**(job.stats or {}), **run_stats, "timings": timer.as_dict()}
                 session.add(job)
-                session.commit()
-                session.refresh(job)
-        raise
+                if commit_guard is not None:
+                    await commit_guard(session)
+                await session.commit()
+                await session.refresh(job)
+        except PipelineAborted:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Pipeline failed: %s", exc)
+            async with async_session_scope() as session:
+                failed = await session.get(Job, job.id)
+                if failed:
+                    failed.status = "FAIL"
+                    failed.summary = str(exc)
+                    failed.finished_at = datetime.utcnow()
+                    failed.stats = {**(failed.stats or {}), **run_stats, "timings": timer.as_dict()}
+                    session.add(failed)
+                    if commit_guard is not None:
+                        # Raises PipelineAborted if another worker owns the job now.
+                        await commit_guard(session)
+                    await session.commit()
+            raise
+        # The job is committed; a failed notification must not turn it into a FAIL.
+        for report in reports:
+            try:
+                await send_report(*report)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Failed to queue report for %s: %s", report[0], exc)
+    return job
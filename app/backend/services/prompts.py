@@ -0,0 +1,63 @@
+"""Prompt templates parsed once and rendered in a single pass."""
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+
+PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+_PLACEHOLDER = re.compile(r"{{\s*(\w+)\s*}}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Template split into literal fragments around `{{name}}` placeholders."""
+
+    source: str
+    fragments: tuple[str, ...]
+    names: tuple[str, ...]
+
+    @classmethod
+    def parse(cls, source: str) -> PromptTemplate:
+        parts = _PLACEHOLDER.split(source)
+        return cls(source=source, fragments=tuple(parts[0::2]), names=tuple(parts[1::2]))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """Interleave fragments and values, joining once; unknown placeholders are kept verbatim."""
+
+        pieces = [self.fragments[0]]
+        for name, fragment in zip(self.names, self.fragments[1:], strict=True):
+            pieces.append(values[name] if name in values else f"{{{{{name}}}}}")
+            pieces.append(fragment)
+        return "".join(pieces)
+
+
+class TemplateLoader:
+    """Caches parsed templates and re-parses a file only when its mtime changes."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self._cache: dict[str, tuple[int, PromptTemplate]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> PromptTemplate:
+        path = self.root / name
+        mtime = path.stat().st_mtime_ns
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            template = PromptTemplate.parse(path.read_text(encoding="utf-8"))
+            self._cache[name] = (mtime, template)
+        return template
+
+    def preload(self) -> None:
+        """Parse every `*.txt` template up front so the first job does not pay for it."""
+
+        for path in sorted(self.root.glob("*.txt")):
+            self.get(path.name)
+
+
+prompt_templates = TemplateLoader(PROMPTS_DIR)
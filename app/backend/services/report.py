@@ -1,25 +1,245 @@
 """Reporting utilities for Telegram notifications."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
 from typing import Any
 
-from telegram import InputFile
-from telegram.error import TelegramError
-from telegram.ext import Application
+from telegram import Bot, InputMediaPhoto
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
 
 from ..core.config import get_settings
+from .charts import ensure_chart
+from .settings_provider import current_settings
 
 logger = logging.getLogger(__name__)
 
+MEDIA_GROUP_SIZE = 10
+TEXT_LIMIT = 4096
+_DRAIN_BATCH = 50
 
-async def send_report(ticker: str, features: dict[str, Any], backtest: dict[str, Any], decision: dict[str, Any], chart_path: str | None) -> None:
-    """Send Telegram notification summarising result."""
 
-    settings = get_settings()
-    if not settings.telegram_bot_token or not settings.telegram_chat_id:
-        logger.warning("Telegram credentials missing; skipping notification")
-        return
+@dataclass
+class ReportMessage:
+    chat_id: str
+    caption: str
+    photo: str | None = None
+
+
+class TelegramOutbox:
+    """Queue of outbound messages sent by a single worker through one shared bot.
+
+    Messages already waiting when the worker wakes up are grouped per chat: photos go
+    out as media groups of up to ten, text-only reports are concatenated up to
+    Telegram's message limit. Charts not yet on disk are rendered from their cache key
+    here, off the pipeline's path. Sends to a chat are spaced by `per_chat_interval`
+    seconds per message, RetryAfter and network errors are retried with backoff, and
+    `close` waits for the queue to drain before releasing the bot.
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        per_chat_interval: float = 1.0,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+    ) -> None:
+        self.bot = bot
+        self.per_chat_interval = per_chat_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.queue: asyncio.Queue[ReportMessage] = asyncio.Queue()
+        self._next_send: dict[str, float] = {}
+        self._worker: asyncio.Task[None] | None = None
+
+    async def start(self) -> None:
+        if self._worker is None:
+            await self.bot.initialize()
+            self._worker = asyncio.create_task(self._run())
+
+    def enqueue(self, message: ReportMessage) -> None:
+        self.queue.put_nowait(message)
+
+    async def close(self, timeout: float | None = None) -> None:
+        """Send whatever is queued (up to `timeout` seconds), then stop the worker and bot."""
+
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except TimeoutError:
+            logger.warning("Dropping %s unsent Telegram messages on shutdown", self.queue.qsize())
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+        self._worker = None
+        await self.bot.shutdown()
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < _DRAIN_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._send_batch(batch)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Telegram send worker error: %s", exc)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _send_batch(self, batch: list[ReportMessage]) -> None:
+        by_chat: dict[str, list[ReportMessage]] = {}
+        for message in batch:
+            by_chat.setdefault(message.chat_id, []).append(message)
+        for chat_id, messages in by_chat.items():
+            photos = [message for message in messages if message.photo]
+            for start in range(0, len(photos), MEDIA_GROUP_SIZE):
+                await self._send_photos(chat_id, photos[start : start + MEDIA_GROUP_SIZE])
+            for text in _pack_texts([message.caption for message in messages if not message.photo]):
+                await self._deliver(
+                    chat_id,
+                    1,
+                    lambda chat=chat_id, text=text: self.bot.send_message(chat_id=chat, text=text),
+                )
+
+    async def _send_photos(self, chat_id: str, messages: list[ReportMessage]) -> None:
+        loaded = await asyncio.to_thread(_read_photos, messages)
+        # A chart evicted between enqueue and send only downgrades its own report to text.
+        pairs = list(zip(messages, loaded, strict=True))
+        for text in _pack_texts([m.caption for m, content in pairs if content is None]):
+            await self._deliver(
+                chat_id, 1, lambda text=text: self.bot.send_message(chat_id=chat_id, text=text)
+            )
+        messages = [m for m, content in pairs if content is not None]
+        contents = [content for content in loaded if content is not None]
+        if not messages:
+            return
+        if len(messages) == 1:
+            await self._deliver(
+                chat_id,
+                1,
+                lambda: self.bot.send_photo(
+                    chat_id=chat_id, photo=contents[0], caption=messages[0].caption
+                ),
+            )
+            return
+        media = [
+            InputMediaPhoto(media=content, caption=m.caption)
+            for content, m in zip(contents, messages, strict=True)
+        ]
+        await self._deliver(
+            chat_id, len(media), lambda: self.bot.send_media_group(chat_id=chat_id, media=media)
+        )
+
+    async def _deliver(self, chat_id: str, cost: int, send: Any) -> None:
+        """Call `send()` once the chat's rate window allows it, retrying transient failures."""
+
+        for attempt in range(self.max_retries + 1):
+            delay = self._next_send.get(chat_id, 0.0) - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                await send()
+            except RetryAfter as exc:
+                retry_after = exc.retry_after
+                if isinstance(retry_after, timedelta):
+                    wait = retry_after.total_seconds()
+                else:
+                    wait = float(retry_after)
+                self._next_send[chat_id] = time.monotonic() + wait
+                logger.warning("Telegram rate limit for chat %s, retrying in %.1fs", chat_id, wait)
+                continue
+            except BadRequest as exc:
+                logger.error("Telegram rejected message for chat %s: %s", chat_id, exc)
+                return
+            except NetworkError as exc:
+                backoff = random.uniform(0, self.backoff_base * 2**attempt)
+                self._next_send[chat_id] = time.monotonic() + backoff
+                logger.warning("Telegram send failed (attempt %s): %s", attempt + 1, exc)
+                continue
+            except TelegramError as exc:
+                logger.error("Failed to send Telegram message: %s", exc)
+                return
+            self._next_send[chat_id] = time.monotonic() + self.per_chat_interval * cost
+            return
+        logger.error(
+            "Giving up on Telegram message for chat %s after %s attempts",
+            chat_id,
+            self.max_retries + 1,
+        )
+
+
+def _read_photos(messages: list[ReportMessage]) -> list[bytes | None]:
+    """Load each message's chart, rendering it from its cache key if it is not on disk."""
+
+    contents: list[bytes | None] = []
+    for message in messages:
+        try:
+            path = Path(message.photo or "")
+            if not path.is_file():
+                path = ensure_chart(path.name)
+            contents.append(path.read_bytes())
+        except (OSError, ValueError, LookupError) as exc:
+            logger.warning("Chart %s unavailable, sending text only: %s", message.photo, exc)
+            contents.append(None)
+    return contents
+
+
+def _pack_texts(texts: list[str]) -> list[str]:
+    """Join texts with blank lines into as few messages as fit under TEXT_LIMIT."""
+
+    packed: list[str] = []
+    for text in texts:
+        if packed and len(packed[-1]) + len(text) + 2 <= TEXT_LIMIT:
+            packed[-1] = f"{packed[-1]}\n\n{text}"
+        else:
+            packed.append(text[:TEXT_LIMIT])
+    return packed
+
+
+_outbox: TelegramOutbox | None = None
+_outbox_token: str | None = None
+
+
+async def get_outbox() -> TelegramOutbox:
+    """Return the process-wide outbox, creating the bot and worker on first use.
+
+    A bot token changed through the settings API drains and replaces the outbox, so
+    long-lived worker processes pick it up on their next run.
+    """
+
+    global _outbox, _outbox_token
+    settings = current_settings()
+    if _outbox is not None and settings.telegram_bot_token != _outbox_token:
+        await close_outbox()
+    if _outbox is None:
+        outbox = TelegramOutbox(
+            Bot(settings.telegram_bot_token),
+            per_chat_interval=settings.telegram_rate_interval,
+            max_retries=settings.telegram_max_retries,
+        )
+        await outbox.start()
+        _outbox, _outbox_token = outbox, settings.telegram_bot_token
+    return _outbox
+
+
+async def close_outbox() -> None:
+    """Drain pending messages and shut down the shared bot."""
+
+    global _outbox, _outbox_token
+    if _outbox is not None:
+        outbox, _outbox, _outbox_token = _outbox, None, None
+        await outbox.close(timeout=get_settings().telegram_drain_timeout)
+
+
+def build_caption(
+    ticker: str, features: dict[str, Any], backtest: dict[str, Any], decision: dict[str, Any]
+) -> str:
     caption_lines = [
         f"Ticker: {ticker}",
         f"Close: {features.get('close', 'n/a'):.2f} | RSI: {features.get('rsi', 0):.1f}",
@@ -27,14 +247,25 @@ async def send_report(ticker: str, features: dict[str, Any], backtest: dict[str,
         f"Reason: {decision.get('reason', '')}",
         f"Backtest: sharpe={backtest.get('sharpe', 'n/a')} hit={backtest.get('hit_rate', 'n/a')} n={backtest.get('n', 0)}",
     ]
-    caption = "\n".join(caption_lines)
-    try:
-        app = Application.builder().token(settings.telegram_bot_token).build()
-        if chart_path:
-            await app.bot.send_photo(chat_id=settings.telegram_chat_id, photo=InputFile(chart_path), caption=caption)
-        else:
-            await app.bot.send_message(chat_id=settings.telegram_chat_id, text=caption)
-    except TelegramError as exc:
-        logger.error("Failed to send Telegram message: %s", exc)
-    finally:
-        await app.shutdown()
+    return "\n".join(caption_lines)
+
+
+async def send_report(
+    ticker: str,
+    features: dict[str, Any],
+    backtest: dict[str, Any],
+    decision: dict[str, Any],
+    chart_path: str | None,
+) -> None:
+    """Queue a Telegram notification summarising result."""
+
+    settings = current_settings()
+    if not settings.telegram_bot_token or not settings.telegram_chat_id:
+        logger.warning("Telegram credentials missing; skipping notification")
+        return
+    caption = build_caption(ticker, features, backtest, decision)
+    # The chart is rendered by the outbox worker when it sends, not here after the run.
+    outbox = await get_outbox()
+    outbox.enqueue(
+        ReportMessage(chat_id=settings.telegram_chat_id, caption=caption, photo=chart_path)
+    )
@@ -1,14 +1,21 @@
 """Research service retrieving recent news for tickers."""
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Protocol
+from typing import Any, ClassVar, Protocol
 
 import httpx
+from sqlmodel import delete
 
 from ..core.config import get_settings
+from ..core.database import session_scope
+from ..models.research_cache import ResearchCache
+from .settings_provider import current_settings
 
 logger = logging.getLogger(__name__)
 
@@ -20,22 +27,104 @@ class NewsProvider(Protocol):
         """Return structured news items for the ticker."""
 
 
+class RateLimiter:
+    """Spaces calls at least `1 / rate` seconds apart across concurrent tasks."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_http_client: httpx.AsyncClient | None = None
+_rate_limiters: dict[str, RateLimiter] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive client used by every news provider."""
+
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        concurrency = get_settings().news_concurrency
+        _http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    if provider not in _rate_limiters:
+        _rate_limiters[provider] = RateLimiter(get_settings().news_rate_limit)
+    return _rate_limiters[provider]
+
+
 @dataclass
-class _BaseNewsProvider:
+class _BaseNewsProvider(ABC):
     api_key: str | None
+    client: httpx.AsyncClient | None = None
+
+    name: ClassVar[str]
+    url: ClassVar[str]
+
+    @abstractmethod
+    def build_payload(self, ticker: str) -> dict[str, Any]:
+        """Request body for `ticker`; its "query" also keys the cache."""
+
+    async def get_news(self, ticker: str) -> list[dict]:
+        """Return cached items when fresh; concurrent callers for one key share a request."""
 
-    async def _request(self, url: str, payload: dict[str, str]) -> list[dict]:
         if not self.api_key:
             logger.warning("News provider missing API key; returning empty response")
             return []
+        payload = self.build_payload(ticker)
+        key = f"{self.name}:{ticker}:{payload.get('query', '')}"
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load_or_fetch(key, ticker, payload))
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _load_or_fetch(self, key: str, ticker: str, payload: dict[str, Any]) -> list[dict]:
+        ttl = get_settings().news_cache_ttl
+        if ttl > 0:
+            cached = await asyncio.to_thread(_load_cached, key, ttl)
+            if cached is not None:
+                return cached
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(url, json=payload, headers={"Authorization": f"Bearer {self.api_key}"})
-                response.raise_for_status()
-                data = response.json()
+            items = await self._request(self.url, payload)
         except Exception as exc:  # noqa: BLE001
             logger.error("News provider request failed: %s", exc)
             return []
+        if ttl > 0:
+            await asyncio.to_thread(_store_cached, key, self.name, ticker, items, ttl)
+        return items
+
+    async def _request(self, url: str, payload: dict[str, Any]) -> list[dict]:
+        client = self.client or get_http_client()
+        await get_rate_limiter(self.name).acquire()
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        response = await client.post(url, json=payload, headers=headers)
+        response.raise_for_status()
+        data = response.json()
         items = data if isinstance(data, list) else data.get("results", [])
         parsed: list[dict] = []
         for item in items:
@@ -56,22 +145,49 @@ class _BaseNewsProvider:
         return parsed
 
 
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def _load_cached(key: str, ttl: int) -> list[dict] | None:
+    with session_scope() as session:
+        entry = session.get(ResearchCache, key)
+        if entry is None or entry.fetched_at < datetime.utcnow() - timedelta(seconds=ttl):
+            return None
+        return json.loads(entry.payload)
+
+
+def _store_cached(key: str, provider: str, ticker: str, items: list[dict], ttl: int) -> None:
+    with session_scope() as session:
+        now = datetime.utcnow()
+        cutoff = now - timedelta(seconds=ttl)
+        session.execute(delete(ResearchCache).where(ResearchCache.fetched_at < cutoff))
+        entry = session.get(ResearchCache, key) or ResearchCache(
+            key=key, provider=provider, ticker=ticker, payload=""
+        )
+        entry.payload = json.dumps(items)
+        entry.fetched_at = now
+        session.add(entry)
+        session.commit()
+
+
 class PerplexityNewsProvider(_BaseNewsProvider):
     """Simplified Perplexity API wrapper."""
 
-    async def get_news(self, ticker: str) -> list[dict]:
-        payload = {"query": f"Latest market moving news for {ticker}", "size": 5}
-        url = "https://api.perplexity.ai/search"
-        return await self._request(url, payload)
+    name = "perplexity"
+    url = "https://api.perplexity.ai/search"
+
+    def build_payload(self, ticker: str) -> dict[str, Any]:
+        return {"query": f"Latest market moving news for {ticker}", "size": 5}
 
 
 class TavilyNewsProvider(_BaseNewsProvider):
     """Simplified Tavily API wrapper."""
 
-    async def get_news(self, ticker: str) -> list[dict]:
-        payload = {"query": f"{ticker} breaking news", "search_depth": "basic"}
-        url = "https://api.tavily.com/search"
-        return await self._request(url, payload)
+    name = "tavily"
+    url = "https://api.tavily.com/search"
+
+    def build_payload(self, ticker: str) -> dict[str, Any]:
+        return {"query": f"{ticker} breaking news", "search_depth": "basic"}
 
 
 def _provider_factory(provider: str, api_key: str | None) -> NewsProvider:
@@ -83,7 +199,7 @@ def _provider_factory(provider: str, api_key: str | None) -> NewsProvider:
 async def fetch_news_for_ticker(ticker: str) -> list[dict]:
     """Fetch and filter fresh news for a ticker."""
 
-    settings = get_settings()
+    settings = current_settings()
     provider = _provider_factory(settings.news_provider, settings.news_api_key)
     items = await provider.get_news(ticker)
     cutoff = datetime.now(timezone.utc) - timedelta(days=1)
@@ -93,14 +209,17 @@ async def fetch_news_for_ticker(ticker: str) -> list[dict]:
 
 
 async def fetch_news_for_watchlist(tickers: list[str]) -> dict[str, list[dict]]:
-    """Fetch news for each ticker returning JSON serialisable dict."""
+    """Fetch news for each ticker concurrently, returning JSON serialisable dict."""
 
-    results: dict[str, list[dict]] = {}
-    for ticker in tickers:
-        try:
-            news = await fetch_news_for_ticker(ticker)
-        except Exception as exc:  # noqa: BLE001
-            logger.error("Failed to fetch news for %s: %s", ticker, exc)
-            news = []
-        results[ticker] = news
-    return results
+    semaphore = asyncio.Semaphore(get_settings().news_concurrency)
+
+    async def fetch(ticker: str) -> list[dict]:
+        async with semaphore:
+            try:
+                return await fetch_news_for_ticker(ticker)
+            except Exception as exc:  # noqa: BLE001
+                logger.error("Failed to fetch news for %s: %s", ticker, exc)
+                return []
+
+    news = await asyncio.gather(*(fetch(ticker) for ticker in tickers))
+    return dict(zip(tickers, news, strict=True))
@@ -0,0 +1,81 @@
+"""Shared storage for the content-addressed result caches kept in the database.
+
+Each cache is a table keyed by a content hash, with a JSON payload column and an
+indexed `created_at`. Rows older than the cache's TTL are never served and are
+dropped on the next store, which also trims the oldest rows above a size budget.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, literal
+from sqlmodel import SQLModel, delete, select
+
+from ..core.database import session_scope
+
+logger = logging.getLogger(__name__)
+
+
+def load_entries(model: Any, keys: dict[str, str], payload: str, ttl: int) -> dict[str, Any]:
+    """Return the decoded `payload` column of fresh rows by name, for a {name: key} mapping."""
+
+    if ttl <= 0 or not keys:
+        return {}
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+    names_by_key = {key: name for name, key in keys.items()}
+    try:
+        with session_scope() as session:
+            rows = session.exec(
+                select(model.key, getattr(model, payload)).where(
+                    model.key.in_(list(names_by_key)), model.created_at >= cutoff
+                )
+            ).all()
+            return {names_by_key[key]: json.loads(value) for key, value in rows}
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Cache lookup in %s failed: %s", model.__tablename__, exc)
+        return {}
+
+
+def store_entries(
+    model: Any, entries: Iterable[SQLModel], ttl: int, max_total: int, size: str | None = None
+) -> None:
+    """Upsert `entries`, then evict expired rows and the oldest rows above `max_total`.
+
+    The budget counts rows, or sums the `size` column when one is named.
+    """
+
+    if ttl <= 0:
+        return
+    now = datetime.utcnow()
+    try:
+        with session_scope() as session:
+            for entry in entries:
+                entry.created_at = now  # type: ignore[attr-defined]
+                session.merge(entry)
+            session.execute(delete(model).where(model.created_at < now - timedelta(seconds=ttl)))
+            session.commit()
+            _evict_over_budget(session, model, max_total, size)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Cache store in %s failed: %s", model.__tablename__, exc)
+
+
+def _evict_over_budget(session: Any, model: Any, max_total: int, size: str | None) -> None:
+    weight = getattr(model, size) if size else literal(1)
+    total = session.exec(select(func.coalesce(func.sum(weight), 0)).select_from(model)).one()
+    excess = total - max_total
+    if excess <= 0:
+        return
+    keys = []
+    for key, row_weight in session.exec(select(model.key, weight).order_by(model.created_at)):
+        keys.append(key)
+        excess -= row_weight
+        if excess <= 0:
+            break
+    session.execute(
+        delete(model).where(model.key.in_(keys)), execution_options={"synchronize_session": False}
+    )
+    session.commit()
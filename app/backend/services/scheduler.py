@@ -1,14 +1,13 @@
 """APScheduler integration."""
 from __future__ import annotations
 
-import asyncio
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from ..core.config import get_settings
-from .pipeline import run_pipeline
+from .job_queue import enqueue_run
 
 logger = logging.getLogger(__name__)
 
@@ -31,17 +30,12 @@ class PipelineScheduler:
         logger.info("Scheduler started (cron %s:00 %s)", settings.cron_hour, settings.timezone)
 
     @staticmethod
-    def _job_wrapper() -> None:
-        from ..core.database import session_scope
-        from ..models.job import Job
-
-        with session_scope() as session:
-            job = Job()
-            session.add(job)
-            session.commit()
-            session.refresh(job)
-            job_id = job.id
-        asyncio.create_task(run_pipeline(job_id=job_id))
+    async def _job_wrapper() -> None:
+        from ..core.database import async_session_scope
+
+        async with async_session_scope() as session:
+            job = await enqueue_run(session)
+        logger.info("Queued scheduled job %s", job.id)
 
 
 pipeline_scheduler = PipelineScheduler()
@@ -0,0 +1,104 @@
+"""Runtime settings: DB `Setting` overrides merged over env defaults."""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from ..core.config import Settings, get_settings
+from ..core.database import session_scope
+from ..models.setting import Setting
+
+# Setting columns whose Settings field has a different name.
+_FIELD_NAMES = {"provider": "news_provider"}
+# Columns of the Setting row that are not settings.
+_ROW_ONLY = {"id", "saved_at"}
+# Values every auto-created row carries; on rows never saved they are not overrides.
+_ROW_DEFAULTS = {name: field.default for name, field in Setting.__fields__.items()}
+
+
+class SettingsSnapshot(Settings):
+    """Merged settings for one run; read-only so every stage sees the same values."""
+
+    class Config:
+        allow_mutation = False
+
+
+_lock = threading.Lock()
+_cached: tuple[Settings, float, SettingsSnapshot] | None = None
+_current: ContextVar[SettingsSnapshot | None] = ContextVar("current_settings", default=None)
+
+
+def build_snapshot(base: Settings, setting: Setting | None) -> SettingsSnapshot:
+    """Overlay the non-null columns of `setting` on `base`.
+
+    A row that was never saved through the API (`saved_at` is NULL) was created with
+    the model defaults, so its columns still equal to those defaults leave `base` alone.
+    """
+
+    values = base.dict()
+    if setting is not None:
+        legacy = setting.saved_at is None
+        for name, value in setting.dict(exclude=_ROW_ONLY).items():
+            if value is None or (legacy and value == _ROW_DEFAULTS[name]):
+                continue
+            values[_FIELD_NAMES.get(name, name)] = value
+    return SettingsSnapshot.construct(**values)
+
+
+def snapshot_as_setting(snapshot: Settings) -> Setting:
+    """Return an unsaved `Setting` carrying the effective values of `snapshot`."""
+
+    return Setting(
+        **{
+            name: getattr(snapshot, _FIELD_NAMES.get(name, name))
+            for name in Setting.__fields__
+            if name not in _ROW_ONLY
+        }
+    )
+
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    """Return the cached merged settings, reloading the `Setting` row when stale.
+
+    The cache is dropped by `invalidate_settings_snapshot` (called when settings are
+    saved), when the env settings are reloaded, and after SETTINGS_CACHE_TTL seconds so
+    other processes pick up changes too.
+    """
+
+    global _cached
+    base = get_settings()
+    cached = _cached
+    if cached is not None and cached[0] is base:
+        if time.monotonic() - cached[1] < base.settings_cache_ttl:
+            return cached[2]
+    with _lock:
+        with session_scope() as session:
+            setting = session.get(Setting, 1)
+        snapshot = build_snapshot(base, setting)
+        _cached = (base, time.monotonic(), snapshot)
+    return snapshot
+
+
+def invalidate_settings_snapshot() -> None:
+    global _cached
+    _cached = None
+
+
+def current_settings() -> Settings:
+    """Return the snapshot bound to the running job, or the latest one outside a job."""
+
+    return _current.get() or get_settings_snapshot()
+
+
+@contextmanager
+def use_settings(snapshot: SettingsSnapshot) -> Iterator[SettingsSnapshot]:
+    """Bind `snapshot` for the current context; tasks and threads started inside inherit it."""
+
+    token = _current.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _current.reset(token)
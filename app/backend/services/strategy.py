@@ -1,47 +1,163 @@
 """Strategy service interacting with LLM."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
-from pathlib import Path
+from email.utils import parsedate_to_datetime
 from typing import Any
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, AuthenticationError, BadRequestError, PermissionDeniedError
 
 from ..core.config import get_settings
+from ..core.serialization import dumps_json
+from .llm_cache import (
+    decision_key,
+    load_decisions,
+    load_discoveries,
+    store_decisions,
+    store_discoveries,
+)
+from .prompts import prompt_templates
+from .settings_provider import current_settings
 
 logger = logging.getLogger(__name__)
-PROMPTS_DIR = Path(__file__).resolve().parents[1] / "prompts"
+_NON_RETRYABLE = (AuthenticationError, BadRequestError, PermissionDeniedError)
 
 
-def _load_prompt(name: str) -> str:
-    return (PROMPTS_DIR / name).read_text(encoding="utf-8")
+@dataclass
+class LLMMetrics:
+    """Request, latency and token-usage counters for the LLM calls of one job."""
 
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    latency_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
 
-async def call_openai_with_retry(messages: list[dict[str, str]], retries: int = 1) -> dict[str, Any]:
-    settings = get_settings()
+    def as_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "latency_s": round(self.latency_s, 3)}
+
+
+# Set by generate_strategy; tasks spawned from it inherit the same metrics object.
+_metrics: ContextVar[LLMMetrics | None] = ContextVar("llm_metrics", default=None)
+_openai_client: AsyncOpenAI | None = None
+_openai_credentials: tuple[str, str | None] | None = None
+# Close tasks of replaced clients, referenced until done so they are not collected early.
+_closing_clients: set[asyncio.Task] = set()
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the process-wide OpenAI client, sharing one HTTP connection pool.
+
+    The key comes from the current settings snapshot, so a key saved through the
+    settings API replaces the client on the next run of a long-lived worker.
+    """
+
+    global _openai_client, _openai_credentials
+    settings = current_settings()
     if not settings.openai_api_key:
         raise RuntimeError("OPENAI_API_KEY missing")
-    client = AsyncOpenAI(api_key=settings.openai_api_key)
+    credentials = (settings.openai_api_key, settings.openai_base_url)
+    if _openai_client is None or credentials != _openai_credentials:
+        if _openai_client is not None:
+            _close_replaced_client(_openai_client)
+        # Retries are handled here so they honour the per-call deadline.
+        _openai_client = AsyncOpenAI(api_key=credentials[0], base_url=credentials[1], max_retries=0)
+        _openai_credentials = credentials
+    return _openai_client
+
+
+def _close_replaced_client(client: AsyncOpenAI) -> None:
+    task = asyncio.get_running_loop().create_task(client.close())
+    _closing_clients.add(task)
+    task.add_done_callback(_client_closed)
+
+
+def _client_closed(task: asyncio.Task) -> None:
+    _closing_clients.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Failed to close replaced OpenAI client: %s", task.exception())
+
+
+async def close_openai_client() -> None:
+    global _openai_client, _openai_credentials
+    if _closing_clients:
+        await asyncio.gather(*_closing_clients, return_exceptions=True)
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+        _openai_credentials = None
+
+
+def _retry_delay(exc: Exception, attempt: int) -> float:
+    """Server-provided Retry-After when present, else capped exponential backoff with jitter."""
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(headers["retry-after"])
+                return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    settings = get_settings()
+    return random.uniform(0, min(settings.llm_backoff_max, settings.llm_backoff_base * 2**attempt))
+
+
+async def call_openai_with_retry(
+    messages: list[dict[str, str]], retries: int = 1
+) -> dict[str, Any]:
+    settings = get_settings()
+    client = get_openai_client()
+    metrics = _metrics.get() or LLMMetrics()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.llm_call_timeout
     attempt = 0
     while True:
+        started = time.perf_counter()
+        metrics.requests += 1
         try:
-            response = await client.chat.completions.create(
-                model="gpt-4o-mini",
-                temperature=0.2,
-                messages=messages,
-                response_format={"type": "json_object"},
-            )
+            async with asyncio.timeout(max(deadline - loop.time(), 0.0)):
+                response = await client.chat.completions.create(
+                    model=settings.openai_model,
+                    temperature=0.2,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                )
+            metrics.latency_s += time.perf_counter() - started
+            if response.usage is not None:
+                metrics.prompt_tokens += response.usage.prompt_tokens
+                metrics.completion_tokens += response.usage.completion_tokens
             message = response.choices[0].message.content
             if not message:
                 raise ValueError("Empty response")
             return json.loads(message)
         except Exception as exc:  # noqa: BLE001
-            if attempt >= retries:
+            metrics.failures += 1
+            if attempt >= retries or isinstance(exc, _NON_RETRYABLE):
+                raise
+            delay = _retry_delay(exc, attempt)
+            if loop.time() + delay >= deadline:
                 raise
-            logger.warning("OpenAI call failed (%s); retrying", exc)
+            logger.warning("OpenAI call failed (%s); retrying in %.1fs", exc, delay)
+            metrics.retries += 1
             attempt += 1
+            await asyncio.sleep(delay)
 
 
 async def generate_strategy(
@@ -49,31 +165,241 @@ async def generate_strategy(
     research: dict[str, Any],
     features: dict[str, Any],
     backtests: dict[str, Any],
+    stats: dict[str, Any] | None = None,
 ) -> dict[str, Any]:
-    """Generate trading plan via OpenAI."""
+    """Generate trading plan via OpenAI, reusing cached per-ticker decisions.
+
+    Tickers whose inputs, prompts and model are unchanged are served from the LLM cache.
+    When `stats` is given, cache hit/miss counts and request metrics are written to
+    `stats["llm_cache"]` and `stats["llm"]`.
+    """
+
+    metrics = LLMMetrics()
+    token = _metrics.set(metrics)
+    try:
+        return await _generate_with_cache(watchlist, research, features, backtests, stats)
+    finally:
+        _metrics.reset(token)
+        if stats is not None:
+            stats["llm"] = metrics.as_dict()
+
 
-    system_prompt = _load_prompt("system_prompt.txt")
-    user_template = _load_prompt("user_prompt_template.txt")
+async def _generate_with_cache(
+    watchlist: list[dict[str, Any]],
+    research: dict[str, Any],
+    features: dict[str, Any],
+    backtests: dict[str, Any],
+    stats: dict[str, Any] | None,
+) -> dict[str, Any]:
     settings = get_settings()
-    now_utc = datetime.now(timezone.utc).isoformat()
-    user_prompt = user_template.replace("{{now_utc}}", now_utc)
-    user_prompt = user_prompt.replace("{{settings_json}}", json.dumps(settings_as_payload(settings)))
-    user_prompt = user_prompt.replace("{{watchlist_json}}", json.dumps(watchlist))
-    user_prompt = user_prompt.replace("{{research_json}}", json.dumps(research))
-    user_prompt = user_prompt.replace("{{features_json}}", json.dumps(features))
-    user_prompt = user_prompt.replace("{{backtests_json}}", json.dumps(backtests))
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt},
+    prompts = [
+        prompt_templates.get(name).source
+        for name in ("system_prompt.txt", "user_prompt_template.txt")
     ]
+    keys = {
+        entry["symbol"]: decision_key(
+            settings.openai_model,
+            prompts,
+            {
+                "watchlist": entry,
+                "research": research.get(entry["symbol"]),
+                "features": features.get(entry["symbol"]),
+                "backtests": backtests.get(entry["symbol"]),
+                "settings": settings_as_payload(current_settings()),
+            },
+        )
+        for entry in watchlist
+    }
+    cached = await asyncio.to_thread(load_decisions, keys)
+    remaining = [entry for entry in watchlist if entry["symbol"] not in cached]
+    if stats is not None:
+        stats["llm_cache"] = {"hits": len(cached), "misses": len(remaining)}
+    if watchlist and not remaining:
+        response = {
+            "asof_utc": datetime.now(timezone.utc).isoformat(),
+            "decisions": list(cached.values()),
+            "notes": "All decisions served from cache",
+        }
+        # Without a cached entry for this exact watchlist the discoveries are unknown,
+        # so the key is left out rather than reported as empty.
+        discoveries = await asyncio.to_thread(load_discoveries, keys)
+        if discoveries is not None:
+            response["discoveries"] = discoveries
+        return response
+
     try:
-        response = await call_openai_with_retry(messages, retries=1)
+        response = await _generate(remaining, research, features, backtests)
+    except Exception:
+        if not cached:
+            raise
+        logger.exception("LLM generation failed; keeping %s cached decisions", len(cached))
+        response = {
+            "asof_utc": datetime.now(timezone.utc).isoformat(),
+            "decisions": [_failed_decision(entry["symbol"]) for entry in remaining],
+            "discoveries": [],
+            "notes": "LLM unavailable",
+        }
+    fresh = {
+        item["ticker"]: item
+        for item in response.get("decisions", [])
+        if item.get("ticker") and "llm_failed" not in item.get("gatekeeper", {}).get("reasons", [])
+    }
+    await asyncio.to_thread(store_decisions, settings.openai_model, keys, fresh)
+    if not cached and fresh.keys() >= keys.keys():
+        # The LLM saw the whole watchlist, so its discoveries can stand in for a later
+        # run whose decisions all come from the cache.
+        discoveries = response.get("discoveries", [])
+        await asyncio.to_thread(store_discoveries, settings.openai_model, keys, discoveries)
+    response["decisions"] = [*cached.values(), *response.get("decisions", [])]
+    return response
+
+
+async def _generate(
+    watchlist: list[dict[str, Any]],
+    research: dict[str, Any],
+    features: dict[str, Any],
+    backtests: dict[str, Any],
+) -> dict[str, Any]:
+    if get_settings().llm_shard_tokens > 0 and len(watchlist) > 1:
+        return await _generate_sharded(watchlist, research, features, backtests)
+    messages = _build_messages(watchlist, research, features, backtests)
+    try:
+        response = await call_openai_with_retry(messages, retries=get_settings().llm_max_retries)
     except Exception as exc:  # noqa: BLE001
         logger.error("LLM generation failed: %s", exc)
         raise
     return response
 
 
+def _build_messages(
+    watchlist: list[dict[str, Any]],
+    research: dict[str, Any],
+    features: dict[str, Any],
+    backtests: dict[str, Any],
+) -> list[dict[str, str]]:
+    system_prompt = prompt_templates.get("system_prompt.txt").source
+    user_prompt = prompt_templates.get("user_prompt_template.txt").render(
+        {
+            "now_utc": datetime.now(timezone.utc).isoformat(),
+            "settings_json": dumps_json(settings_as_payload(current_settings())),
+            "watchlist_json": dumps_json(watchlist),
+            "research_json": dumps_json(research),
+            "features_json": dumps_json(features),
+            "backtests_json": dumps_json(backtests),
+        }
+    )
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _estimate_tokens(payload: Any) -> int:
+    # ~4 characters per token for JSON-heavy English text; only used for budgeting.
+    return len(dumps_json(payload)) // 4 + 1
+
+
+def shard_watchlist(
+    watchlist: list[dict[str, Any]],
+    research: dict[str, Any],
+    features: dict[str, Any],
+    backtests: dict[str, Any],
+    budget_tokens: int,
+) -> list[list[dict[str, Any]]]:
+    """Greedily pack tickers into shards whose per-ticker inputs fit `budget_tokens`."""
+
+    shards: list[list[dict[str, Any]]] = []
+    current: list[dict[str, Any]] = []
+    used = 0
+    for entry in watchlist:
+        symbol = entry["symbol"]
+        cost = _estimate_tokens(
+            [entry, research.get(symbol), features.get(symbol), backtests.get(symbol)]
+        )
+        if current and used + cost > budget_tokens:
+            shards.append(current)
+            current, used = [], 0
+        current.append(entry)
+        used += cost
+    if current:
+        shards.append(current)
+    return shards
+
+
+async def _generate_sharded(
+    watchlist: list[dict[str, Any]],
+    research: dict[str, Any],
+    features: dict[str, Any],
+    backtests: dict[str, Any],
+) -> dict[str, Any]:
+    settings = get_settings()
+    overhead = _estimate_tokens(_build_messages([], {}, {}, {}))
+    budget = max(settings.llm_shard_tokens - overhead, 1)
+    shards = shard_watchlist(watchlist, research, features, backtests, budget)
+    semaphore = asyncio.Semaphore(settings.llm_concurrency)
+
+    async def run_shard(shard: list[dict[str, Any]]) -> dict[str, Any]:
+        symbols = {entry["symbol"] for entry in shard}
+        messages = _build_messages(
+            shard,
+            {symbol: value for symbol, value in research.items() if symbol in symbols},
+            {symbol: value for symbol, value in features.items() if symbol in symbols},
+            {symbol: value for symbol, value in backtests.items() if symbol in symbols},
+        )
+        async with semaphore:
+            return await call_openai_with_retry(messages, retries=get_settings().llm_max_retries)
+
+    results: dict[int, dict[str, Any]] = {}
+    pending = list(range(len(shards)))
+    for attempt in range(settings.llm_shard_retries + 1):
+        outcomes = await asyncio.gather(
+            *(run_shard(shards[index]) for index in pending), return_exceptions=True
+        )
+        failed = []
+        for index, outcome in zip(pending, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                logger.warning(
+                    "LLM shard %s/%s failed (attempt %s): %s",
+                    index + 1,
+                    len(shards),
+                    attempt + 1,
+                    outcome,
+                )
+                failed.append(index)
+            else:
+                results[index] = outcome
+        pending = failed
+        if not pending:
+            break
+    if not results:
+        raise RuntimeError(f"All {len(shards)} LLM shards failed")
+
+    merged: dict[str, Any] = {
+        "asof_utc": datetime.now(timezone.utc).isoformat(),
+        "decisions": [],
+        "discoveries": [],
+        "notes": "",
+    }
+    notes = []
+    for index in sorted(results):
+        merged["decisions"].extend(results[index].get("decisions", []))
+        merged["discoveries"].extend(results[index].get("discoveries", []))
+        if results[index].get("notes"):
+            notes.append(str(results[index]["notes"]))
+    for index in pending:
+        merged["decisions"].extend(_failed_decision(entry["symbol"]) for entry in shards[index])
+    merged["notes"] = " | ".join(notes)
+    return merged
+
+
+def _failed_decision(symbol: str) -> dict[str, Any]:
+    return {
+        "ticker": symbol,
+        "playbook": "NO_TRADE",
+        "gatekeeper": {"precheck": "BLOCK", "reasons": ["llm_failed"]},
+    }
+
+
 def settings_as_payload(settings: Any) -> dict[str, Any]:
     return {
         "size_risk_pct": settings.size_risk_pct,
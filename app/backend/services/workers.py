@@ -0,0 +1,74 @@
+"""Process pool running the CPU-bound part of the pipeline."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import pandas as pd
+
+from ..core.config import get_settings
+from .backtest import QUICK_BACKTEST_SPEC, quick_backtest
+from .robustness import RobustnessSpec, robustness_metrics
+
+logger = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+
+
+@dataclass
+class TickerAnalysis:
+    symbol: str
+    backtest: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+
+def analyse_ticker(
+    symbol: str, df: pd.DataFrame, robustness: RobustnessSpec | None = None
+) -> TickerAnalysis:
+    """Run the backtest for one symbol, plus the robustness checks if a spec is given.
+
+    Runs inside a worker process.
+    """
+
+    try:
+        metrics = quick_backtest(df).metrics
+    except Exception as exc:  # noqa: BLE001
+        return TickerAnalysis(symbol=symbol, error=str(exc))
+    if robustness is not None and metrics.get("status") == "OK":
+        # The point backtest stands on its own; a failed robustness pass only drops the bounds.
+        try:
+            metrics.update(robustness_metrics(df, QUICK_BACKTEST_SPEC["lookback"], robustness))
+        except Exception as exc:  # noqa: BLE001
+            metrics["robustness_error"] = str(exc) or type(exc).__name__
+    return TickerAnalysis(symbol=symbol, backtest=metrics)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared process pool, creating it on first use.
+
+    Workers are spawned rather than forked: the parent already runs the event loop,
+    aiosqlite and `to_thread` threads, and forking a multi-threaded process can
+    deadlock the child on a lock held by another thread. Everything submitted to the
+    pool must therefore be a picklable module-level function with picklable arguments.
+    """
+
+    global _executor
+    if _executor is None:
+        workers = get_settings().pipeline_workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("spawn")
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        logger.info("Process pool started with %s workers", workers)
+    return _executor
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared process pool if it was started."""
+
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterator
+
 import pandas as pd
 import pytest
 
 from ..core.config import get_settings
-from ..core.database import init_db, session_scope
+from ..core.database import dispose_async_engine, init_db, session_scope
 from ..models.ticker import Ticker
 
 
@@ -18,6 +21,14 @@ def setup_db() -> None:
     get_settings.cache_clear()  # type: ignore[attr-defined]
 
 
+@pytest.fixture(autouse=True)
+def close_async_engine() -> Iterator[None]:
+    # Pooled aiosqlite connections run on non-daemon threads and are bound to the
+    # test's event loop, so each test starts and ends without any.
+    yield
+    asyncio.run(dispose_async_engine())
+
+
 @pytest.fixture()
 def sample_dataframe() -> pd.DataFrame:
     dates = pd.date_range("2023-01-01", periods=120, freq="D")
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
+import pytest
 
 from ..services import backtest
 
@@ -9,3 +11,53 @@ def test_quick_backtest_returns_metrics(sample_dataframe: pd.DataFrame) -> None:
     result = backtest.quick_backtest(sample_dataframe)
     assert result.metrics["status"] == "OK"
     assert result.metrics["n"] > 0
+
+
+def _reference(
+    close: pd.Series, lookback: int, threshold: float, slippage: float = 0.0
+) -> dict[str, float]:
+    prices = close.pct_change().dropna()
+    signal = (prices.rolling(lookback).mean() > threshold).astype(int)
+    position = signal.shift(1).fillna(0)
+    returns = position * prices - slippage * position.diff().fillna(position).abs()
+    equity = (1 + returns).cumprod()
+    drawdown = (equity.cummax() - equity) / equity.cummax()
+    return {
+        "n": len(returns),
+        "sharpe": np.sqrt(252) * returns.mean() / (returns.std() + 1e-6),
+        "max_dd": drawdown.max(),
+        "hit_rate": (returns > 0).mean(),
+    }
+
+
+def test_sweep_matches_per_symbol_pandas_backtest() -> None:
+    rng = np.random.default_rng(7)
+    frames = {}
+    for symbol, rows in (("A", 200), ("B", 150), ("C", 90)):
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.02, rows))
+        index = pd.date_range("2024-01-01", periods=rows)
+        frames[symbol] = pd.DataFrame({"close": close}, index=index)
+
+    result = backtest.sweep_frames(frames, lookbacks=(3, 5, 20), thresholds=(-0.001, 0.0, 0.002))
+
+    assert result.values.shape == (3, 3, 3, len(backtest.SWEEP_METRICS))
+    for symbol, frame in frames.items():
+        for lookback in result.lookbacks:
+            for threshold in result.thresholds:
+                expected = _reference(frame["close"], lookback, threshold)
+                actual = result.metrics(symbol, lookback, threshold)
+                assert actual == pytest.approx(expected, rel=1e-6, abs=1e-9)
+    assert set(result.best()) == {"A", "B", "C"}
+
+
+def test_quick_backtest_pays_slippage_on_position_changes(sample_dataframe: pd.DataFrame) -> None:
+    spec = backtest.QUICK_BACKTEST_SPEC
+    expected = _reference(
+        sample_dataframe["close"], spec["lookback"], spec["threshold"], spec["slippage"]
+    )
+    frictionless = _reference(sample_dataframe["close"], spec["lookback"], spec["threshold"])
+
+    metrics = backtest.quick_backtest(sample_dataframe).metrics
+
+    assert {name: metrics[name] for name in expected} == pytest.approx(expected, rel=1e-6, abs=1e-9)
+    assert metrics["sharpe"] < frictionless["sharpe"]
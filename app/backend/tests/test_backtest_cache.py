@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import uuid
+
+import pandas as pd
+import pytest
+
+from ..core.config import get_settings
+from ..services import backtest_cache
+
+
+def test_backtest_cache_keys_on_bars_and_round_trips(
+    monkeypatch: pytest.MonkeyPatch, sample_dataframe: pd.DataFrame
+) -> None:
+    symbol = f"SYM{uuid.uuid4().hex[:8]}"
+    key = backtest_cache.backtest_key(symbol, sample_dataframe)
+    assert backtest_cache.backtest_key(symbol, sample_dataframe.copy()) == key
+    changed = sample_dataframe.copy()
+    changed.iloc[-1, changed.columns.get_loc("close")] += 0.01
+    assert backtest_cache.backtest_key(symbol, changed) != key
+
+    metrics = {"n": 119, "status": "OK", "sharpe": 1.1}
+    backtest_cache.store_backtests({symbol: key}, {symbol: metrics})
+    assert backtest_cache.load_backtests({symbol: key, "OTHER": "missing"}) == {symbol: metrics}
+
+    monkeypatch.setenv("BACKTEST_CACHE_TTL", "0")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    assert backtest_cache.load_backtests({symbol: key}) == {}
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ..services import charts
+from ..services.market_data import BarStore
+
+
+def test_ensure_chart_renders_once_and_caches(
+    tmp_path: Path, sample_dataframe: pd.DataFrame
+) -> None:
+    store = BarStore(tmp_path / "bars")
+    store.append("AAPL", "1d", sample_dataframe)
+    cache = charts.ChartCache(tmp_path / "charts", max_bytes=10_000_000)
+    key = charts.chart_key("AAPL", sample_dataframe.index[-1])
+
+    first = charts.ensure_chart(key, store=store, cache=cache)
+    mtime = first.stat().st_mtime_ns
+    second = charts.ensure_chart(key, store=store, cache=cache)
+
+    assert first == second
+    assert first.read_bytes().startswith(b"\x89PNG")
+    assert second.stat().st_size > 0 and mtime <= second.stat().st_mtime_ns
+    missing = charts.chart_key("MSFT", sample_dataframe.index[-1])
+    with pytest.raises(LookupError):
+        charts.ensure_chart(missing, store=store, cache=cache)
+    with pytest.raises(ValueError):
+        charts.ensure_chart("../secret.png", store=store, cache=cache)
+
+
+def test_ensure_chart_serves_existing_legacy_file(tmp_path: Path) -> None:
+    cache = charts.ChartCache(tmp_path / "charts", max_bytes=10_000_000)
+    legacy = tmp_path / "charts" / "AAPL_20240101120000.png"
+    legacy.write_bytes(b"\x89PNG legacy")
+    (tmp_path / "secret.png").write_bytes(b"\x89PNG secret")
+
+    store = BarStore(tmp_path / "bars")
+
+    assert charts.ensure_chart(legacy.name, store=store, cache=cache) == legacy
+    with pytest.raises(ValueError):
+        charts.ensure_chart("../secret.png", store=store, cache=cache)
+    with pytest.raises(ValueError):
+        charts.ensure_chart("MSFT_20240101120000.png", store=store, cache=cache)
+
+
+def test_cache_rescans_only_over_budget_and_skips_vanished_files(
+    tmp_path: Path, monkeypatch
+) -> None:
+    cache = charts.ChartCache(tmp_path / "charts", max_bytes=1000)
+    scans = []
+    evict = cache.evict
+
+    def counted_evict() -> None:
+        scans.append(1)
+        evict()
+
+    def render(path: Path) -> None:
+        path.write_bytes(b"x" * 100)
+
+    monkeypatch.setattr(cache, "evict", counted_evict)
+    for index in range(12):
+        cache.put(f"K{index:02d}.png", render)
+    # The first put scans to learn the size on disk; the next only once over budget,
+    # evicting the oldest files down to the low-water mark.
+    assert len(scans) == 2
+    kept = sorted(path.name for path in (tmp_path / "charts").glob("*.png"))
+    assert kept == [f"K{index:02d}.png" for index in range(3, 12)]
+
+    stat = Path.stat
+
+    def vanished(path: Path, **kwargs):  # type: ignore[no-untyped-def]
+        if path.name == "K03.png":
+            raise FileNotFoundError(path)
+        return stat(path, **kwargs)
+
+    monkeypatch.setattr(Path, "stat", vanished)
+    cache.evict()
+    assert cache.get("K11.png") is not None
+
+
+def test_concurrent_renders_of_one_key_both_return_the_chart(
+    tmp_path: Path, sample_dataframe: pd.DataFrame, monkeypatch
+) -> None:
+    store = BarStore(tmp_path / "bars")
+    store.append("AAPL", "1d", sample_dataframe)
+    cache = charts.ChartCache(tmp_path / "charts", max_bytes=10_000_000)
+    key = charts.chart_key("AAPL", sample_dataframe.index[-1])
+    both_rendered = threading.Barrier(2, timeout=10)
+    render_chart = charts.render_chart
+
+    def render_in_step(*args, **kwargs) -> None:  # type: ignore[no-untyped-def]
+        # Both callers finish writing before either publishes.
+        render_chart(*args, **kwargs)
+        both_rendered.wait()
+
+    monkeypatch.setattr(charts, "render_chart", render_in_step)
+    with ThreadPoolExecutor(2) as pool:
+        calls = [pool.submit(charts.ensure_chart, key, store=store, cache=cache) for _ in range(2)]
+        paths = [call.result() for call in calls]
+
+    assert paths == [tmp_path / "charts" / key] * 2
+    assert paths[0].read_bytes().startswith(b"\x89PNG")
+    assert [path.name for path in (tmp_path / "charts").iterdir()] == [key]
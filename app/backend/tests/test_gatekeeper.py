@@ -1,5 +1,12 @@
 from __future__ import annotations
 
+import json
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from ..core.config import Settings
 from ..services import gatekeeper
 
 
@@ -8,3 +15,135 @@ def test_gatekeeper_blocks_on_spread(monkeypatch) -> None:
     status, reasons = gatekeeper.apply_gatekeeper({"spread_pct": 0.5, "vol_rel": 2}, {"status": "OK", "n": 100, "sharpe": 1.0, "max_dd": 0.05, "hit_rate": 0.6})
     assert status == "BLOCK"
     assert "spread" in reasons[0]
+
+
+def test_db_setting_overrides_env_and_is_invalidated(monkeypatch) -> None:
+    from ..core.database import session_scope
+    from ..models.setting import Setting
+    from ..services.settings_provider import (
+        get_settings_snapshot,
+        invalidate_settings_snapshot,
+        use_settings,
+    )
+
+    monkeypatch.setenv("MIN_SHARPE", "0.5")
+    metrics = {"status": "OK", "n": 100, "sharpe": 1.0, "max_dd": 0.05, "hit_rate": 0.6}
+    features = {"spread_pct": 0.01, "vol_rel": 2}
+    with session_scope() as session:
+        session.merge(Setting(id=1, min_sharpe=2.0, news_api_key=None))
+        session.commit()
+    try:
+        invalidate_settings_snapshot()
+        snapshot = get_settings_snapshot()
+        assert snapshot.min_sharpe == 2.0 and snapshot.min_vol_rel == 1.2
+        assert get_settings_snapshot() is snapshot
+        with use_settings(snapshot):
+            assert gatekeeper.apply_gatekeeper(features, metrics) == ("BLOCK", ["sharpe below min"])
+    finally:
+        with session_scope() as session:
+            session.delete(session.get(Setting, 1))
+            session.commit()
+        invalidate_settings_snapshot()
+    assert gatekeeper.apply_gatekeeper(features, metrics)[0] == "PASS"
+
+
+def test_unsaved_setting_row_from_older_versions_keeps_env_thresholds(monkeypatch) -> None:
+    from ..core.database import _engine, init_db, session_scope
+    from ..models.setting import Setting
+    from ..services.settings_provider import get_settings_snapshot, invalidate_settings_snapshot
+
+    # The row older versions created on first read: every column at the model default,
+    # except a threshold that was changed by hand.
+    with _engine.begin() as connection:
+        connection.exec_driver_sql('ALTER TABLE setting DROP COLUMN "saved_at"')
+        connection.exec_driver_sql(
+            "INSERT INTO setting (id, provider, timezone, cron_hour, size_risk_pct,"
+            " max_spread_pct, min_vol_rel, min_sharpe, max_dd, min_hit_rate, min_sample)"
+            " VALUES (1, 'perplexity', 'Europe/Brussels', 7, 0.75, 0.15, 1.2, 0.8, 0.08, 0.48, 50)"
+        )
+    monkeypatch.setenv("MAX_SPREAD_PCT", "0.3")
+    monkeypatch.setenv("MIN_SAMPLE", "20")
+    try:
+        init_db()
+        invalidate_settings_snapshot()
+        snapshot = get_settings_snapshot()
+        assert (snapshot.max_spread_pct, snapshot.min_sample) == (0.3, 50)
+
+        with session_scope() as session:
+            setting = session.get(Setting, 1)
+            setting.saved_at = datetime.utcnow()
+            session.add(setting)
+            session.commit()
+        invalidate_settings_snapshot()
+        assert get_settings_snapshot().max_spread_pct == 0.15
+    finally:
+        with session_scope() as session:
+            session.delete(session.get(Setting, 1))
+            session.commit()
+        invalidate_settings_snapshot()
+
+
+def test_gatekeeper_can_gate_on_lower_confidence_bound(monkeypatch) -> None:
+    metrics = {
+        "status": "OK",
+        "n": 100,
+        "sharpe": 1.0,
+        "max_dd": 0.05,
+        "hit_rate": 0.6,
+        "sharpe_lo": 0.2,
+        "hit_rate_lo": 0.5,
+    }
+    features = {"spread_pct": 0.01, "vol_rel": 2}
+    assert gatekeeper.apply_gatekeeper(features, metrics)[0] == "PASS"
+    monkeypatch.setenv("GATE_ON_LOWER_BOUND", "true")
+    assert gatekeeper.apply_gatekeeper(features, metrics, Settings()) == (
+        "BLOCK",
+        ["sharpe lower bound below min"],
+    )
+
+
+def test_watchlist_rules_match_per_ticker_gate_and_accept_extra_rules(monkeypatch) -> None:
+    features = {
+        "A": {"spread_pct": 0.01, "vol_rel": 2, "rsi": 85.0},
+        "B": {"spread_pct": 0.5, "vol_rel": 0.5},
+    }
+    backtests = {
+        "A": {"status": "OK", "n": 100, "sharpe": 1.0, "max_dd": 0.05, "hit_rate": 0.6},
+        "B": {"status": "INSUFFICIENT_DATA"},
+        "C": {"status": "OK", "n": 10, "sharpe": None, "max_dd": 0.2, "hit_rate": 0.4},
+    }
+    result = gatekeeper.evaluate_watchlist(features, backtests, Settings())
+    for row, ticker in enumerate(result.tickers):
+        assert (result.status(row), result.reasons(row)) == gatekeeper.apply_gatekeeper(
+            features.get(ticker, {}), backtests[ticker], Settings()
+        )
+    assert result.codes(1) == ["spread", "vol_rel", "insufficient_data"]
+
+    rule = '[{"name": "overbought", "column": "rsi", "op": ">", "threshold": 80}]'
+    monkeypatch.setenv("GATE_RULES", rule)
+    result = gatekeeper.evaluate_watchlist(features, backtests, Settings())
+    assert result.as_dict()["A"] == ("BLOCK", ["rsi > 80"])
+
+
+def test_gate_rules_are_validated_and_bad_saved_rules_are_skipped(monkeypatch) -> None:
+    rule = {"name": "tz", "column": "rsi", "op": ">", "threshold": "timezone"}
+    monkeypatch.setenv("GATE_RULES", json.dumps([rule]))
+    with pytest.raises(ValidationError):
+        Settings()
+    monkeypatch.delenv("GATE_RULES")
+
+    # A rule saved before validation tightened is ignored instead of failing the run.
+    settings = Settings().copy(update={"gate_rules": [rule]})
+    status, reasons = gatekeeper.apply_gatekeeper(
+        {"spread_pct": 0.01, "vol_rel": 2, "rsi": 99},
+        {"status": "OK", "n": 100, "sharpe": 1.0, "max_dd": 0.05, "hit_rate": 0.6},
+        settings,
+    )
+    assert (status, reasons) == ("PASS", [])
+
+
+def test_empty_watchlist_gates_nothing() -> None:
+    result = gatekeeper.evaluate_watchlist({}, {}, Settings())
+    assert result.tickers == []
+    assert result.blocked.shape == (0, len(gatekeeper.compile_rules(Settings()).rules))
+    assert result.as_dict() == {}
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..services import incremental, panel
+from ..services.market_data import BarStore
+
+
+def test_incremental_state_matches_full_recompute(
+    tmp_path: Path, sample_dataframe: pd.DataFrame
+) -> None:
+    store = BarStore(tmp_path)
+    df = sample_dataframe.copy()
+    df["close"] = df["close"] + np.sin(np.arange(len(df)))
+
+    incremental.update_indicator_state("AAPL", df.iloc[:100], store=store)
+    revised = df.iloc[:100].copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] += 5.0
+    incremental.update_indicator_state("AAPL", revised, store=store)
+    latest = incremental.update_indicator_state("AAPL", df, store=store)
+
+    expected = panel.compute_panel_features(panel.build_panel({"AAPL": df})).as_dicts()["AAPL"]
+    for name in ("rsi", "atr", "vol_rel", "gap_pct"):
+        assert np.isclose(latest[name], expected[name])
+    assert np.isclose(latest["levels"]["sma_50"], expected["levels"]["sma_50"])
+
+
+def test_rolling_window_recovers_after_nan_is_evicted() -> None:
+    window = incremental.RollingWindow(3)
+    for value in (1.0, float("nan"), 2.0):
+        window.push(value)
+    assert np.isnan(window.mean_with(3.0))
+
+    for value in (4.0, 5.0):
+        window.push(value)
+    assert window.missing == 0
+    assert np.isclose(window.mean_with(6.0), (2.0 + 4.0 + 5.0 + 6.0) / 4)
+    restored = incremental._window(3, list(window.values))
+    assert (restored.total, restored.missing) == (window.total, 0)
+
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+from sqlmodel import delete, select
+
+from ..core.config import get_settings
+from ..core.database import async_session_scope
+from ..models.job import Job
+from ..models.queued_run import QueuedRun
+from ..services import job_queue
+from ..services.job_queue import QueueWorker, claim_next, enqueue_run, queue_stats, requeue_stale
+from ..services.pipeline import PipelineAborted, run_pipeline
+
+
+@pytest.fixture(autouse=True)
+async def empty_queue() -> None:
+    async with async_session_scope() as session:
+        await session.execute(delete(QueuedRun))
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_runs_are_claimed_once_in_fifo_order() -> None:
+    async with async_session_scope() as session:
+        first = await enqueue_run(session)
+        second = await enqueue_run(session, ticker="AAPL")
+        assert first.status == "QUEUED"
+
+        claimed = await claim_next(session, "w1")
+        assert claimed is not None and claimed.job_id == first.id
+        other = await claim_next(session, "w2")
+        assert other is not None and (other.job_id, other.ticker) == (second.id, "AAPL")
+        assert await claim_next(session, "w3") is None
+
+        stats = await queue_stats(session)
+        assert stats["depth"] == 0
+        assert stats["counts"]["CLAIMED"] == 2
+        assert stats["active_workers"] == 2
+        assert stats["claim_latency_s"]["samples"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_claims_are_requeued_then_failed() -> None:
+    async with async_session_scope() as session:
+        job = await enqueue_run(session)
+        for attempt in (1, 2):
+            claimed = await claim_next(session, "crashed")
+            assert claimed is not None and claimed.attempts == attempt
+            claimed.heartbeat_at = datetime.utcnow() - timedelta(minutes=5)
+            session.add(claimed)
+            running = await session.get(Job, job.id)
+            running.status = "RUNNING"
+            session.add(running)
+            await session.commit()
+            await requeue_stale(session, stale_after=60, max_attempts=2)
+            if attempt == 1:
+                assert (await session.get(Job, job.id, populate_existing=True)).status == "QUEUED"
+
+        run = await session.get(QueuedRun, claimed.id, populate_existing=True)
+        assert run.status == "FAILED"
+        assert (await session.get(Job, job.id, populate_existing=True)).status == "FAIL"
+        assert (await queue_stats(session))["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_claimed_job_and_marks_it_done(monkeypatch) -> None:
+    calls = []
+
+    async def fake_run_pipeline(*, single_ticker=None, job_id=None, commit_guard=None):  # type: ignore[no-untyped-def]
+        calls.append((single_ticker, job_id))
+
+    monkeypatch.setattr(job_queue, "run_pipeline", fake_run_pipeline)
+    async with async_session_scope() as session:
+        job = await enqueue_run(session, ticker="MSFT")
+
+    worker = QueueWorker("test-worker")
+    assert await worker.run_once() is True
+    assert await worker.run_once() is False
+    assert calls == [("MSFT", job.id)]
+    async with async_session_scope() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.stats["queue"]["worker"] == "test-worker"
+        assert (await queue_stats(session))["counts"]["DONE"] == 1
+
+
+async def _steal(run_job_id: int) -> None:
+    async with async_session_scope() as session:
+        await session.execute(
+            update(QueuedRun).where(QueuedRun.job_id == run_job_id).values(worker_id="thief")
+        )
+        await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_worker_cancels_run_when_claim_is_stolen(monkeypatch) -> None:
+    outcome = {}
+
+    async def slow_pipeline(*, single_ticker=None, job_id=None, commit_guard=None):  # type: ignore[no-untyped-def]
+        await _steal(job_id)
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            outcome["cancelled"] = True
+            raise
+
+    monkeypatch.setenv("QUEUE_HEARTBEAT_INTERVAL", "0.05")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    monkeypatch.setattr(job_queue, "run_pipeline", slow_pipeline)
+    async with async_session_scope() as session:
+        job = await enqueue_run(session)
+
+    assert await asyncio.wait_for(QueueWorker("victim").run_once(), timeout=2) is True
+    assert outcome == {"cancelled": True}
+    async with async_session_scope() as session:
+        run = (await session.exec(select(QueuedRun).where(QueuedRun.job_id == job.id))).one()
+        assert (run.status, run.worker_id) == ("CLAIMED", "thief")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_rolls_back_when_claim_is_lost_before_commit() -> None:
+    async with async_session_scope() as session:
+        job = await enqueue_run(session)
+        queued = await claim_next(session, "victim")
+    await _steal(job.id)
+
+    async def still_claimed(session):  # type: ignore[no-untyped-def]
+        if not await job_queue.heartbeat(session, queued.id, "victim", commit=False):
+            raise PipelineAborted("claim lost")
+
+    with pytest.raises(PipelineAborted):
+        await run_pipeline(job_id=job.id, commit_guard=still_claimed)
+    async with async_session_scope() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.status == "QUEUED" and stored.finished_at is None
+
+
+@pytest.mark.asyncio
+async def test_failed_pipeline_leaves_a_stolen_job_alone(monkeypatch) -> None:
+    from ..services import pipeline
+
+    async def broken(*args, **kwargs):  # type: ignore[no-untyped-def]
+        raise RuntimeError("feed down")
+
+    monkeypatch.setattr(pipeline, "_analyse_watchlist", broken)
+    async with async_session_scope() as session:
+        job = await enqueue_run(session)
+        queued = await claim_next(session, "victim")
+    await _steal(job.id)
+
+    async def still_claimed(session):  # type: ignore[no-untyped-def]
+        if not await job_queue.heartbeat(session, queued.id, "victim", commit=False):
+            raise PipelineAborted("claim lost")
+
+    with pytest.raises(PipelineAborted):
+        await run_pipeline(job_id=job.id, commit_guard=still_claimed)
+    async with async_session_scope() as session:
+        stored = await session.get(Job, job.id)
+        assert stored.status == "QUEUED" and stored.finished_at is None
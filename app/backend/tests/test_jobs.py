@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+from sqlmodel import delete
+
+from ..core.database import _engine, session_scope
+from ..models.job import Job
+from ..models.job_result import JobResult
+from ..routes.jobs import _stream_results, fetch_job_page, get_job, list_jobs, parse_result_fields
+from ..schemas.job import JobRead
+
+
+def test_job_pages_follow_cursor_and_filters() -> None:
+    base = datetime(2001, 1, 1)
+    with session_scope() as session:
+        session.execute(delete(Job).where(Job.started_at < base + timedelta(days=3)))
+        jobs = [
+            Job(started_at=base + timedelta(days=i // 2), status="FAIL" if i == 3 else "SUCCESS")
+            for i in range(5)
+        ]
+        session.add_all(jobs)
+        session.commit()
+        expected = sorted((job.started_at, job.id) for job in jobs)[::-1]
+        window = {"since": base, "until": base + timedelta(days=3)}
+
+        first, cursor = fetch_job_page(session, 2, **window)
+        second, cursor = fetch_job_page(session, 2, cursor, **window)
+        third, cursor = fetch_job_page(session, 2, cursor, **window)
+        assert [(job.started_at, job.id) for job in first + second + third] == expected
+        assert cursor is None
+
+        failed, _ = fetch_job_page(session, 10, status="FAIL", **window)
+        assert [job.id for job in failed] == [jobs[3].id]
+
+        response = list_jobs(
+            limit=2, since=base, until=base + timedelta(days=3), if_none_match=None, session=session
+        )
+        assert response.headers["X-Next-Cursor"]
+        cached = list_jobs(
+            limit=2,
+            since=base,
+            until=base + timedelta(days=3),
+            if_none_match=response.headers["ETag"],
+            session=session,
+        )
+        assert cached.status_code == 304
+
+
+def test_job_detail_projects_fields_and_streams_ndjson() -> None:
+    with session_scope() as session:
+        job = Job(status="SUCCESS")
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        session.add_all(
+            JobResult(
+                job_id=job.id,
+                ticker=f"T{i}",
+                decision="NO_TRADE",
+                metrics={"n": i},
+                raw_llm={"big": "x"},
+            )
+            for i in range(3)
+        )
+        session.commit()
+
+        detail = get_job(job.id, fields=None, response_format="json", accept=None, session=session)
+        assert [result.ticker for result in detail.results] == ["T0", "T1", "T2"]
+        assert "raw_llm" not in detail.results[0].dict(exclude_unset=True)
+
+        detail = get_job(
+            job.id, fields="raw_llm", response_format="json", accept=None, session=session
+        )
+        assert detail.results[0].dict(exclude_unset=True) == {
+            "id": detail.results[0].id,
+            "ticker": "T0",
+            "raw_llm": {"big": "x"},
+        }
+
+        header = JobRead(
+            id=job.id, started_at=job.started_at, finished_at=None, status=job.status, summary=None
+        )
+        stream = _stream_results(header, parse_result_fields("metrics"))
+        lines = [json.loads(line) for line in stream]
+    assert lines[0]["status"] == "SUCCESS"
+    assert [line["metrics"] for line in lines[1:]] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    # Detail loads and streams filter results by job_id; without an index each scans the table.
+    indexes = inspect(_engine).get_indexes("jobresult")
+    assert ["job_id"] in [index["column_names"] for index in indexes]
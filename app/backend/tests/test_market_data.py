@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from ..services import market_data
+
+
+class FakeDownloader:
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self.calls: list[pd.Timestamp | None] = []
+
+    def __call__(self, symbol, *, start, lookback_days, interval):  # type: ignore[no-untyped-def]
+        self.calls.append(start)
+        if start is None:
+            return self.frame.iloc[:-5]
+        return self.frame[self.frame.index >= start]
+
+
+def test_load_bars_tops_up_from_last_stored_bar(
+    tmp_path: Path, sample_dataframe: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("BAR_STORE_MAX_AGE", "0")
+    store = market_data.BarStore(tmp_path)
+    downloader = FakeDownloader(sample_dataframe)
+
+    first = market_data.load_bars("AAPL", store=store, downloader=downloader)
+    second = market_data.load_bars("AAPL", store=store, downloader=downloader)
+
+    assert downloader.calls == [None, first.index[-1]]
+    assert second.index[-1] == sample_dataframe.index[-1]
+    assert not second.index.duplicated().any()
+
+
+def test_load_bars_batch_splits_frames_and_reports_failures(
+    tmp_path: Path, sample_dataframe: pd.DataFrame
+) -> None:
+    calls: list[list[str]] = []
+
+    def fake_batch(symbols, *, start, lookback_days, interval):  # type: ignore[no-untyped-def]
+        calls.append(symbols)
+        present = [symbol for symbol in symbols if symbol != "MISSING"]
+        return pd.concat({symbol: sample_dataframe for symbol in present}, axis=1)
+
+    result = market_data.load_bars_batch(
+        ["AAPL", "MSFT", "MISSING"],
+        chunk_size=2,
+        store=market_data.BarStore(tmp_path),
+        downloader=fake_batch,
+    )
+
+    assert calls == [["AAPL", "MSFT"], ["MISSING"]]
+    assert set(result.frames) == {"AAPL", "MSFT"}
+    assert list(result.errors) == ["MISSING"]
+
+
+def test_concurrent_writes_to_one_symbol_do_not_share_a_temp_file(
+    tmp_path: Path, sample_dataframe: pd.DataFrame
+) -> None:
+    store = market_data.BarStore(tmp_path)
+    barrier = threading.Barrier(4)
+
+    def write(offset: int) -> None:
+        barrier.wait()
+        for _ in range(10):
+            store.append("AAPL", "1d", sample_dataframe.iloc[offset::4])
+            store.save_state("AAPL", "1d", "rsi", {"offset": offset})
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(4)))
+
+    assert store.load_state("AAPL", "1d", "rsi") is not None
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
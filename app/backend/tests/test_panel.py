@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from ..services import panel
+
+
+def test_panel_matches_per_symbol_rolling(sample_dataframe: pd.DataFrame) -> None:
+    frames = {"LONG": sample_dataframe, "SHORT": sample_dataframe.tail(60)}
+    result = panel.compute_panel_features(panel.build_panel(frames)).as_dicts()
+
+    for symbol, frame in frames.items():
+        expected_sma = frame["close"].rolling(20).mean().iloc[-1]
+        assert np.isclose(result[symbol]["levels"]["sma_20"], expected_sma)
+        assert result[symbol]["rsi"] > 50
+    assert np.isnan(panel.build_panel({"X": sample_dataframe.tail(10)}).close[:-10]).all()
+
+
+def _reference_features(frame: pd.DataFrame, length: int = 14) -> dict[str, float]:
+    close = frame["close"]
+    delta = close.diff()
+    gains = delta.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    losses = (-delta.clip(upper=0)).ewm(alpha=1 / length, min_periods=length).mean()
+    prev_close = close.shift(1)
+    true_range = pd.concat(
+        [
+            frame["high"] - frame["low"],
+            (frame["high"] - prev_close).abs(),
+            (prev_close - frame["low"]).abs(),
+        ],
+        axis=1,
+    ).max(axis=1)
+    true_range[prev_close.isna()] = np.nan
+    return {
+        "rsi": (100 * gains / (gains + losses)).iloc[-1],
+        "atr": true_range.ewm(alpha=1 / length, min_periods=length).mean().iloc[-1],
+        "vol_rel": frame["volume"].iloc[-1] / frame["volume"].rolling(20).mean().iloc[-1],
+    }
+
+
+def test_panel_indicators_match_pandas_reference() -> None:
+    rng = np.random.default_rng(7)
+    frames = {}
+    for symbol, rows in {"A": 250, "B": 90, "C": 31, "D": 15}.items():
+        close = 100 + np.cumsum(rng.normal(0, 1, rows))
+        spread = rng.uniform(0.5, 2.0, rows)
+        frames[symbol] = pd.DataFrame(
+            {
+                "open": close + rng.normal(0, 0.3, rows),
+                "high": close + spread,
+                "low": close - spread,
+                "close": close,
+                "volume": rng.uniform(1e5, 1e6, rows),
+            },
+            index=pd.date_range("2024-01-01", periods=rows, freq="D"),
+        )
+    result = panel.compute_panel_features(panel.build_panel(frames)).as_dicts()
+
+    for symbol, frame in frames.items():
+        expected = _reference_features(frame)
+        for name, value in expected.items():
+            assert np.isclose(result[symbol][name], value, equal_nan=True), (symbol, name)
+    assert np.isnan(result["D"]["vol_rel"]) and not np.isnan(result["D"]["rsi"])
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+from sqlmodel import select
+
+from ..core.database import async_session_scope
+from ..models.job import Job
+from ..models.job_result import JobResult
+from ..services.persistence import result_row, write_job_results
+
+
+@pytest.mark.asyncio
+async def test_write_job_results_inserts_in_batches_and_round_trips_json() -> None:
+    async with async_session_scope() as session:
+        job = Job()
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        rows = (
+            result_row(
+                job.id,
+                f"T{index}",
+                "PASS",
+                {"sharpe": 1.5, "n": index},
+                {"playbook": "BREAKOUT", "sources": ["a"]},
+                None,
+            )
+            for index in range(5)
+        )
+        assert await write_job_results(session, rows, batch_size=2) == 5
+        await session.commit()
+
+        query = select(JobResult).where(JobResult.job_id == job.id).order_by(JobResult.ticker)
+        results = (await session.exec(query)).all()
+        assert [result.ticker for result in results] == ["T0", "T1", "T2", "T3", "T4"]
+        assert results[3].metrics == {"sharpe": 1.5, "n": 3}
+        assert results[0].sources == ["a"]
+        assert results[0].decision == "TRADE_OK"
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from ..core.config import get_settings
+from ..services import panel, pipeline
+
+
+def test_watchlist_features_drop_only_the_failing_symbol(
+    monkeypatch, sample_dataframe: pd.DataFrame
+) -> None:
+    def flaky_update(symbol: str, frame: pd.DataFrame) -> dict:
+        if symbol == "BAD":
+            raise ValueError("corrupt state")
+        return {"close": float(frame["close"].iloc[-1])}
+
+    monkeypatch.setenv("INCREMENTAL_INDICATORS", "true")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    monkeypatch.setattr(pipeline, "update_indicator_state", flaky_update)
+    frames = {"AAPL": sample_dataframe, "BAD": sample_dataframe}
+    assert list(pipeline.compute_watchlist_features(frames)) == ["AAPL"]
+
+    monkeypatch.delenv("INCREMENTAL_INDICATORS")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    build_panel = panel.build_panel
+
+    def strict_build_panel(chunk: dict[str, pd.DataFrame]) -> panel.Panel:
+        if "BAD" in chunk:
+            raise ValueError("misaligned bars")
+        return build_panel(chunk)
+
+    monkeypatch.setattr(pipeline, "build_panel", strict_build_panel)
+    assert list(pipeline.compute_watchlist_features(frames)) == ["AAPL"]
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ..services.prompts import PromptTemplate, TemplateLoader
+
+
+def test_render_substitutes_in_one_pass_and_keeps_unknown_placeholders() -> None:
+    template = PromptTemplate.parse("a={{ a }} b={{b}} c={{c}}")
+    # Values containing placeholder syntax must not be expanded again.
+    assert template.render({"a": "{{b}}", "b": "2"}) == "a={{b}} b=2 c={{c}}"
+
+
+def test_loader_reparses_only_when_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "prompt.txt"
+    path.write_text("hello {{name}}", encoding="utf-8")
+    loader = TemplateLoader(tmp_path)
+    first = loader.get("prompt.txt")
+    assert loader.get("prompt.txt") is first
+
+    path.write_text("bye {{name}}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert loader.get("prompt.txt").render({"name": "x"}) == "bye x"
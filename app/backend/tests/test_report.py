@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from telegram.error import RetryAfter
+
+from ..services.report import ReportMessage, TelegramOutbox
+
+
+class StubBot:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict]] = []
+        self.rate_limited = True
+        self.closed = False
+
+    async def initialize(self) -> None:
+        return None
+
+    async def shutdown(self) -> None:
+        self.closed = True
+
+    async def send_message(self, **kwargs):  # type: ignore[no-untyped-def]
+        if self.rate_limited:
+            self.rate_limited = False
+            raise RetryAfter(0)
+        self.calls.append(("message", kwargs))
+
+    async def send_photo(self, **kwargs):  # type: ignore[no-untyped-def]
+        self.calls.append(("photo", kwargs))
+
+    async def send_media_group(self, **kwargs):  # type: ignore[no-untyped-def]
+        self.calls.append(("media_group", kwargs))
+
+
+@pytest.mark.asyncio
+async def test_outbox_batches_per_chat_retries_and_drains(tmp_path: Path) -> None:
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(b"png")
+    bot = StubBot()
+    outbox = TelegramOutbox(bot, per_chat_interval=0.0)
+    for index in range(12):
+        outbox.enqueue(ReportMessage(chat_id="1", caption=f"photo {index}", photo=str(chart)))
+    outbox.enqueue(ReportMessage(chat_id="1", caption="text a"))
+    outbox.enqueue(ReportMessage(chat_id="2", caption="text b"))
+    await outbox.start()
+    await outbox.close(timeout=5)
+
+    kinds = [(kind, kwargs["chat_id"]) for kind, kwargs in bot.calls]
+    assert kinds == [("media_group", "1"), ("media_group", "1"), ("message", "1"), ("message", "2")]
+    assert [len(kwargs["media"]) for kind, kwargs in bot.calls if kind == "media_group"] == [10, 2]
+    assert bot.closed and outbox.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_outbox_sends_missing_chart_as_text(tmp_path: Path) -> None:
+    chart = tmp_path / "chart.png"
+    chart.write_bytes(b"png")
+    bot = StubBot()
+    bot.rate_limited = False
+    outbox = TelegramOutbox(bot, per_chat_interval=0.0)
+    outbox.enqueue(ReportMessage(chat_id="1", caption="kept", photo=str(chart)))
+    outbox.enqueue(ReportMessage(chat_id="1", caption="evicted", photo=str(tmp_path / "gone.png")))
+    await outbox.start()
+    await outbox.close(timeout=5)
+
+    assert [(kind, kwargs.get("caption") or kwargs.get("text")) for kind, kwargs in bot.calls] == [
+        ("message", "evicted"),
+        ("photo", "kept"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_outbox_renders_charts_when_sending(tmp_path: Path, monkeypatch) -> None:
+    from ..services import report
+
+    rendered = tmp_path / "AAPL_202401011200_b120s20r14.png"
+
+    def ensure_chart(key: str) -> Path:
+        rendered.write_bytes(b"png")
+        return tmp_path / key
+
+    monkeypatch.setattr(report, "ensure_chart", ensure_chart)
+    bot = StubBot()
+    outbox = TelegramOutbox(bot, per_chat_interval=0.0)
+    photo = str(tmp_path / "cache" / rendered.name)
+    outbox.enqueue(ReportMessage(chat_id="1", caption="lazy", photo=photo))
+    assert not rendered.exists()
+    await outbox.start()
+    await outbox.close(timeout=5)
+
+    assert [(kind, kwargs["photo"]) for kind, kwargs in bot.calls] == [("photo", b"png")]
@@ -37,3 +37,98 @@ async def test_fetch_news_filters_old_items(monkeypatch: pytest.MonkeyPatch) ->
     result = await research.fetch_news_for_ticker("AAPL")
     assert len(result) == 1
     assert result[0]["title"] == "Fresh"
+
+
+@pytest.mark.asyncio
+async def test_fetch_news_for_watchlist_runs_concurrently_on_shared_client(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request):  # type: ignore[no-untyped-def]
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        published = datetime.now(timezone.utc).isoformat()
+        results = [{"title": "News", "published_at": published}]
+        return research.httpx.Response(200, json={"results": results})
+
+    client = research.httpx.AsyncClient(transport=research.httpx.MockTransport(handler))
+    monkeypatch.setenv("NEWS_CONCURRENCY", "4")
+    monkeypatch.setenv("NEWS_RATE_LIMIT", "0")
+    monkeypatch.setenv("NEWS_CACHE_TTL", "0")
+    monkeypatch.setattr(research, "_rate_limiters", {})
+    monkeypatch.setattr(
+        research,
+        "_provider_factory",
+        lambda provider, api_key: research.TavilyNewsProvider("key", client),
+    )
+
+    result = await research.fetch_news_for_watchlist([f"T{i}" for i in range(8)])
+
+    assert all(len(items) == 1 for items in result.values())
+    assert in_flight["max"] == 4
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_for_same_ticker_are_deduplicated(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = []
+
+    async def handler(request):  # type: ignore[no-untyped-def]
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return research.httpx.Response(200, json={"results": []})
+
+    client = research.httpx.AsyncClient(transport=research.httpx.MockTransport(handler))
+    monkeypatch.setenv("NEWS_RATE_LIMIT", "0")
+    monkeypatch.setenv("NEWS_CACHE_TTL", "0")
+    provider = research.PerplexityNewsProvider("key", client)
+
+    await asyncio.gather(
+        provider.get_news("AAPL"), provider.get_news("AAPL"), provider.get_news("MSFT")
+    )
+
+    assert len(calls) == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_research_cache_hits_within_ttl_and_refetches_after_expiry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls = []
+
+    async def handler(request):  # type: ignore[no-untyped-def]
+        calls.append(request)
+        published = datetime.now(timezone.utc).isoformat()
+        results = [{"title": f"News {len(calls)}", "published_at": published}]
+        return research.httpx.Response(200, json={"results": results})
+
+    client = research.httpx.AsyncClient(transport=research.httpx.MockTransport(handler))
+    monkeypatch.setenv("NEWS_RATE_LIMIT", "0")
+    monkeypatch.setenv("NEWS_CACHE_TTL", "3600")
+    ticker = f"CACHE{datetime.now().timestamp():.0f}"
+    provider = research.TavilyNewsProvider("key", client)
+
+    first = await provider.get_news(ticker)
+    # A fresh provider and an empty in-flight map: the hit can only come from the DB.
+    research._in_flight.clear()
+    second = await research.TavilyNewsProvider("key", client).get_news(ticker)
+    assert len(calls) == 1
+    assert second == first and first[0]["title"] == "News 1"
+
+    key = f"tavily:{ticker}:{provider.build_payload(ticker)['query']}"
+    with research.session_scope() as session:
+        entry = session.get(research.ResearchCache, key)
+        entry.fetched_at = datetime.utcnow() - timedelta(hours=2)
+        session.add(entry)
+        session.commit()
+
+    refreshed = await provider.get_news(ticker)
+    assert len(calls) == 2
+    assert refreshed[0]["title"] == "News 2"
+    await client.aclose()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import delete
+
+from ..core.database import _engine, session_scope
+from ..models.backtest_cache import BacktestCache
+from ..models.llm_cache import LlmCache
+from ..services import result_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_caches() -> None:
+    with session_scope() as session:
+        session.execute(delete(LlmCache))
+        session.execute(delete(BacktestCache))
+        session.commit()
+
+
+def test_oldest_rows_over_budget_are_evicted_in_one_delete() -> None:
+    keys = [uuid.uuid4().hex for _ in range(5)]
+    for index, key in enumerate(keys):
+        entry = LlmCache(key=key, ticker=f"T{index}", model="m", decision="{}", size=40)
+        result_cache.store_entries(LlmCache, [entry], ttl=3600, max_total=1000, size="size")
+
+    deletes = []
+
+    def count_deletes(conn, cursor, statement, *args) -> None:  # type: ignore[no-untyped-def]
+        if statement.startswith("DELETE"):
+            deletes.append(statement)
+
+    event.listen(_engine, "before_cursor_execute", count_deletes)
+    try:
+        last = LlmCache(key=uuid.uuid4().hex, ticker="T5", model="m", decision="{}", size=40)
+        result_cache.store_entries(LlmCache, [last], ttl=3600, max_total=150, size="size")
+    finally:
+        event.remove(_engine, "before_cursor_execute", count_deletes)
+    # One delete for expired rows, one for the budget.
+    assert len(deletes) == 2
+    names = {f"T{index}": key for index, key in enumerate([*keys, last.key])}
+    stored = result_cache.load_entries(LlmCache, names, "decision", 3600)
+    assert sorted(stored) == ["T3", "T4", "T5"]
+
+    for symbol in ("A", "B", "C"):
+        backtest = BacktestCache(key=f"{symbol}-key", symbol=symbol, metrics='{"n": 1}')
+        result_cache.store_entries(BacktestCache, [backtest], ttl=3600, max_total=2)
+    names = {symbol: f"{symbol}-key" for symbol in "ABC"}
+    stored = result_cache.load_entries(BacktestCache, names, "metrics", 3600)
+    assert stored == {"B": {"n": 1}, "C": {"n": 1}}
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from ..core.config import Settings
+from ..services import backtest, robustness
+from ..services.workers import analyse_ticker
+
+
+def test_block_bootstrap_indices_are_contiguous_blocks() -> None:
+    indices = robustness.block_bootstrap_indices(10, 4, 3, np.random.default_rng(1))
+    assert indices.shape == (3, 10)
+    assert indices.min() >= 0 and indices.max() < 10
+    assert np.all((np.diff(indices[:, :4], axis=1) % 10) == 1)
+
+
+def test_robustness_metrics_bracket_the_point_estimate() -> None:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({"close": 100 * np.cumprod(1 + rng.normal(0.001, 0.02, 250))})
+    metrics = robustness.robustness_metrics(df)
+    point = backtest.quick_backtest(df).metrics
+
+    assert metrics["sharpe_lo"] <= point["sharpe"] <= metrics["sharpe_hi"]
+    assert metrics["hit_rate_lo"] <= point["hit_rate"] <= metrics["hit_rate_hi"]
+    assert len(metrics["wf_lookbacks"]) == robustness.RobustnessSpec().folds
+    assert np.isfinite(metrics["oos_sharpe"])
+
+
+def test_failed_robustness_pass_keeps_point_backtest() -> None:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"close": 100 * np.cumprod(1 + rng.normal(0.001, 0.02, 250))})
+    analysis = analyse_ticker("AAPL", df, robustness.RobustnessSpec(folds=0))
+
+    assert analysis.error is None
+    assert analysis.backtest["sharpe"] == backtest.quick_backtest(df).metrics["sharpe"]
+    assert "robustness_error" in analysis.backtest and "sharpe_lo" not in analysis.backtest
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [("BOOTSTRAP_BLOCK", "0"), ("WALK_FORWARD_FOLDS", "0"), ("BOOTSTRAP_CONFIDENCE", "1")],
+)
+def test_robustness_settings_are_bounded(
+    monkeypatch: pytest.MonkeyPatch, name: str, value: str
+) -> None:
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValidationError):
+        Settings()
+
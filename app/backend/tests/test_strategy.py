@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import json
+import uuid
+from types import SimpleNamespace
+
+import httpx
 import pytest
+from openai import AsyncOpenAI
+from sqlmodel import delete
 
+from ..core.config import get_settings
+from ..core.database import session_scope
+from ..models.llm_cache import LlmCache
 from ..services import strategy
+from ..services.settings_provider import build_snapshot, use_settings
 
 
 @pytest.mark.asyncio
@@ -18,3 +29,152 @@ async def test_generate_strategy_builds_prompt(monkeypatch: pytest.MonkeyPatch)
     monkeypatch.setattr(strategy, "call_openai_with_retry", fake_call)
     result = await strategy.generate_strategy([], {}, {}, {})
     assert "decisions" in result
+
+
+@pytest.mark.asyncio
+async def test_sharded_strategy_merges_and_retries_only_failed_shards(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        assert request.url.path == "/v1/chat/completions"
+        assert payload["response_format"] == {"type": "json_object"}
+        prompt = payload["messages"][1]["content"]
+        tickers = [symbol for symbol in ("AAPL", "MSFT") if f'"{symbol}"' in prompt]
+        assert len(tickers) == 1  # one ticker per shard
+        calls.append(tickers[0])
+        if tickers == ["MSFT"] and calls.count("MSFT") == 1:
+            return httpx.Response(500, json={"error": {"message": "overloaded"}})
+        content = {"decisions": [{"ticker": tickers[0], "playbook": "NO_TRADE"}], "discoveries": []}
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": payload["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": json.dumps(content)},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    client = AsyncOpenAI(
+        api_key="sk-test",
+        base_url="http://llm.test/v1",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setenv("LLM_SHARD_TOKENS", "1")
+    monkeypatch.setenv("LLM_MAX_RETRIES", "0")
+    monkeypatch.setenv("LLM_CACHE_TTL", "0")
+    monkeypatch.setattr(strategy, "get_openai_client", lambda: client)
+    watchlist = [{"symbol": "AAPL", "market": "stock"}, {"symbol": "MSFT", "market": "stock"}]
+    result = await strategy.generate_strategy(watchlist, {}, {}, {})
+    await client.close()
+
+    assert sorted(calls) == ["AAPL", "MSFT", "MSFT"]
+    assert {decision["ticker"] for decision in result["decisions"]} == {"AAPL", "MSFT"}
+    assert all(decision["playbook"] == "NO_TRADE" for decision in result["decisions"])
+
+
+@pytest.mark.asyncio
+async def test_unchanged_inputs_are_served_from_llm_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    async def fake_call(messages, retries=1):  # type: ignore[no-untyped-def]
+        calls.append(messages)
+        return {"decisions": [{"ticker": "NVDA", "playbook": "BREAKOUT"}], "discoveries": []}
+
+    monkeypatch.setattr(strategy, "call_openai_with_retry", fake_call)
+    watchlist = [{"symbol": "NVDA", "market": "stock"}]
+    features = {"NVDA": {"rsi": 55.0, "run": uuid.uuid4().hex}}
+    stats: dict = {}
+
+    await strategy.generate_strategy(watchlist, {}, features, {})
+    result = await strategy.generate_strategy(watchlist, {}, features, {}, stats=stats)
+
+    assert len(calls) == 1
+    assert result["decisions"][0]["playbook"] == "BREAKOUT"
+    assert stats["llm_cache"] == {"hits": 1, "misses": 0}
+
+
+@pytest.mark.asyncio
+async def test_fully_cached_watchlist_replays_its_discoveries(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fake_call(messages, retries=1):  # type: ignore[no-untyped-def]
+        return {
+            "decisions": [{"ticker": "NVDA", "playbook": "BREAKOUT"}],
+            "discoveries": [{"ticker": "AMD"}],
+        }
+
+    monkeypatch.setattr(strategy, "call_openai_with_retry", fake_call)
+    watchlist = [{"symbol": "NVDA", "market": "stock"}]
+    features = {"NVDA": {"rsi": 55.0, "run": uuid.uuid4().hex}}
+
+    await strategy.generate_strategy(watchlist, {}, features, {})
+    result = await strategy.generate_strategy(watchlist, {}, features, {})
+    assert result["discoveries"] == [{"ticker": "AMD"}]
+
+    with session_scope() as session:
+        session.execute(delete(LlmCache).where(LlmCache.ticker == "*"))
+        session.commit()
+    result = await strategy.generate_strategy(watchlist, {}, features, {})
+    assert result["decisions"][0]["playbook"] == "BREAKOUT"
+    assert "discoveries" not in result
+
+
+@pytest.mark.asyncio
+async def test_retries_honour_retry_after_and_record_metrics(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class RateLimited(Exception):
+        response = SimpleNamespace(headers={"retry-after": "0"})
+
+    attempts = []
+
+    async def create(**kwargs):  # type: ignore[no-untyped-def]
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            raise RateLimited("429")
+        return SimpleNamespace(
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content='{"decisions": [], "discoveries": []}')
+                )
+            ],
+            usage=SimpleNamespace(prompt_tokens=120, completion_tokens=30),
+        )
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setenv("LLM_CACHE_TTL", "0")
+    monkeypatch.setattr(strategy, "get_openai_client", lambda: client)
+    stats: dict = {}
+
+    await strategy.generate_strategy([], {}, {}, {}, stats=stats)
+
+    assert len(attempts) == 2
+    assert stats["llm"]["requests"] == 2
+    assert stats["llm"]["retries"] == 1
+    assert stats["llm"]["prompt_tokens"] == 120
+
+
+@pytest.mark.asyncio
+async def test_openai_client_follows_snapshot_credentials() -> None:
+    base = get_settings()
+    with use_settings(build_snapshot(base, None).copy(update={"openai_api_key": "sk-env"})):
+        first = strategy.get_openai_client()
+        assert strategy.get_openai_client() is first
+    with use_settings(build_snapshot(base, None).copy(update={"openai_api_key": "sk-saved"})):
+        second = strategy.get_openai_client()
+    assert second is not first and second.api_key == "sk-saved"
+    assert len(strategy._closing_clients) == 1
+    await strategy.close_openai_client()
+    assert not strategy._closing_clients and first.is_closed()
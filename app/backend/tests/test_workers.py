@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from ..core.config import get_settings
+from ..services import robustness
+from ..services.workers import analyse_ticker, get_process_pool, shutdown_process_pool
+
+
+def test_analysis_round_trips_through_the_spawned_pool(monkeypatch) -> None:
+    monkeypatch.setenv("PIPELINE_WORKERS", "1")
+    get_settings.cache_clear()  # type: ignore[attr-defined]
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({"close": 100 * np.cumprod(1 + rng.normal(0.001, 0.02, 250))})
+    spec = robustness.RobustnessSpec(samples=50)
+    try:
+        pool = get_process_pool()
+        context = pool._mp_context
+        assert context is not None and context.get_start_method() == "spawn"
+        analysis = pool.submit(analyse_ticker, "AAPL", df, spec).result(timeout=60)
+    finally:
+        shutdown_process_pool()
+    assert analysis == analyse_ticker("AAPL", df, spec)
@@ -0,0 +1,46 @@
+"""Queue worker entrypoint: `python -m app.backend.worker`.
+
+Each process runs one pipeline at a time; start several to run jobs in parallel.
+SIGINT/SIGTERM stop claiming new runs and let the current one finish.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import signal
+
+from .core import logger as _logging  # noqa: F401  (configures stream + file logging on import)
+from .core.database import dispose_async_engine, init_db
+from .services.job_queue import QueueWorker
+from .services.prompts import prompt_templates
+from .services.report import close_outbox
+from .services.research import close_http_client
+from .services.strategy import close_openai_client
+from .services.workers import shutdown_process_pool
+
+
+async def serve(worker: QueueWorker) -> None:
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, worker.stop)
+    prompt_templates.preload()
+    try:
+        await worker.run()
+    finally:
+        shutdown_process_pool()
+        await close_outbox()
+        await close_http_client()
+        await close_openai_client()
+        await dispose_async_engine()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--worker-id", default=None, help="defaults to <hostname>:<pid>")
+    args = parser.parse_args()
+    init_db()
+    asyncio.run(serve(QueueWorker(args.worker_id)))
+
+
+if __name__ == "__main__":
+    main()